@@ -1,8 +1,9 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, render_template, request, jsonify, send_from_directory, url_for, Response, stream_with_context, g
 import os
-from datetime import datetime
+import json
+import time
 import traceback
-UPLOAD_FOLDER = 'uploads'
+import config
 STATIC_AUDIO_FOLDER = os.path.join('static')  # audio saved inside static so templates can serve it
 MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10 MB
 ALLOWED_EXT = {'.pdf', '.png', '.jpg', '.jpeg', '.txt', '.mp3', '.wav'}
@@ -12,29 +13,67 @@ ENABLE_TERM_EXPLANATIONS = False
 
 # ---- App init ----
 app = Flask(__name__)
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(STATIC_AUDIO_FOLDER, exist_ok=True)
 
 # ---- Import modules safely ----
 # Some modules (HuggingFace, Gemini, model files) may not be available in dev machine.
 # We import and handle missing modules inside try/except blocks in the functions below where needed.
-from modules.ocr_extractor import extract_text
-from modules.fir_simplifier import simplify_fir_text
-from modules.translator import translate_to_language, detect_language
-from modules.tts_generator import text_to_speech
-from modules.outcome_predictor import predict_outcome
-from modules.classifier import predict_crime
-from modules.ipc_explainer import extract_ipc_sections, load_ipc_data
-from modules.dictionary_helper import get_word_meaning
-from modules.legal_summarizer import summarize_legal_text
-# legal_dictionary.explain_terms is optional
-try:
-    from modules.legal_dictionary import explain_terms
-    HAS_EXPLAIN_TERMS = True
-except Exception:
-    HAS_EXPLAIN_TERMS = False
+from modules.ipc_explainer import get_section, get_sections, normalize_section
+from modules.dictionary_helper import get_word_meaning, get_word_meanings, translate_meanings
+from modules.fir_pipeline import run_upload
+from modules.classifier import classifier_info, predict_crime_batch
+from modules.outcome_predictor import evaluate_rules_batch
+from modules import model_registry, result_cache, audio_store, jobs, metrics, uploads
+
+# Uploaded files are hashed while the request body is parsed and kept in memory
+# (spooled to a temporary file above UPLOAD_SPOOL_BYTES), never written to uploads/
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return uploads.stream_factory(total_content_length, content_type, filename, content_length)
+
+
+app.request_class = UploadRequest
+
+# Heavy models load lazily on first use; set PRELOAD_MODELS=1 to load them at startup instead
+# (not in OCR page workers, which import this script again as __mp_main__ when started with `python app.py`)
+if config.PRELOAD_MODELS and __name__ != "__mp_main__":
+    model_registry.warm_up()
+
+
+# ---- Metrics read on every /metrics scrape ----
+metrics.register_collector(
+    "fir_job_queue_depth", "gauge", "Upload jobs waiting for a worker.",
+    lambda: {(): jobs.queue_depth()})
+metrics.register_collector(
+    "model_load_seconds", "gauge", "Time taken to load each model.",
+    lambda: {(("model", name),): info.get("load_seconds")
+             for name, info in model_registry.memory_report().items()})
+metrics.register_collector(
+    "result_cache_lookups_total", "counter", "Result cache lookups by stage and outcome.",
+    lambda: {((("stage", stage), ("result", result))): counts.get(result, 0)
+             for stage, counts in result_cache.stats()["stages"].items()
+             for result in ("memory_hits", "disk_hits", "misses")})
+metrics.register_collector(
+    "result_cache_hit_ratio", "gauge", "Share of result cache lookups answered from memory or disk.",
+    lambda: {(("stage", stage),): counts.get("hit_rate")
+             for stage, counts in result_cache.stats()["stages"].items()})
+
+
+@app.before_request
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def _record_request(response):
+    # url_rule keeps the label set small (one series per route, not per URL)
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    metrics.inc("http_requests_total", endpoint=endpoint, method=request.method, status=response.status_code)
+    start = getattr(g, "request_start", None)
+    if start is not None:
+        metrics.observe("http_request_seconds", time.perf_counter() - start, endpoint=endpoint)
+    return response
 
 
 # ---- Helpers ----
@@ -42,150 +81,243 @@ def allowed_file(filename):
     ext = os.path.splitext(filename)[1].lower()
     return ext in ALLOWED_EXT
 
-def safe_remove(path):
+def close_upload(upload):
     try:
-        if os.path.exists(path):
-            os.remove(path)
+        if upload is not None:
+            upload.close()
     except Exception:
         pass
 
 
+def save_upload():
+    """
+    Validates the 'fir_file' upload and takes it over from the request, still in memory.
+    Returns (upload, user_language, error); upload is a uploads.HashingSpool the caller closes.
+    """
+    if 'fir_file' not in request.files:
+        return None, None, "❌ No file uploaded."
+
+    file = request.files['fir_file']
+    user_language = request.form.get("language", "en") or "en"
+
+    if not file or file.filename == '':
+        return None, None, "❌ No file selected."
+
+    if not allowed_file(file.filename):
+        return None, None, "❌ Unsupported file type."
+
+    # Language comes from the form: anything that is not a short code is bucketed as "other"
+    language_label = user_language if len(user_language) <= 8 and user_language.isalpha() else "other"
+    metrics.inc("fir_requests_total", entry=request.path,
+                file_type=os.path.splitext(file.filename)[1].lower(), language=language_label)
+
+    return uploads.take(file), user_language, None
+
+
+def process_upload(upload, user_language, **kwargs):
+    """
+    run_upload() on an in-memory upload; a byte-identical file seen before reuses its extraction.
+    """
+    return run_upload(upload, user_language, enable_term_explanations=ENABLE_TERM_EXPLANATIONS,
+                      filename=upload.filename, content_hash=upload.hexdigest(), **kwargs)
+
+
+def sse_event(event, data, event_id=None):
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 # ---- Routes ----
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
-        filepath = None
+        upload = None
         try:
-            # Validate file
-            if 'fir_file' not in request.files:
-                return render_template('result.html', error="❌ No file uploaded.")
-
-            file = request.files['fir_file']
-            user_language = request.form.get("language", "en") or "en"
-
-            if not file or file.filename == '':
-                return render_template('result.html', error="❌ No file selected.")
-
-            if not allowed_file(file.filename):
-                return render_template('result.html', error="❌ Unsupported file type.")
-
-            # Save uploaded file
-            filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-
-            # 1) OCR / Text extraction
-            extracted_text = extract_text(filepath)
-            if not extracted_text or not extracted_text.strip() or extracted_text.startswith("❌"):
-                return render_template('result.html', error="❌ Could not extract text from the uploaded file. Please try a clearer scan or use a text file.")
-
-            # 2) Simplify FIR text (Gemini / fallback message)
-            simplified_text = simplify_fir_text(extracted_text)
-            if not simplified_text:
-                simplified_text = "⚠️ Simplification unavailable."
-
-            # 3) Translate if requested (and not English)
-            translated_text = None
-            try:
-                if user_language != 'en' and not simplified_text.startswith(("❌", "⚠️")):
-                    # translate simplified_text into requested language
-                    translated_text = translate_to_language(simplified_text, user_language)
-                    # translator returns text or a failure message starting with ❌
-                else:
-                    # If user requested English or simplified_text is not valid, we keep translated_text None
-                    translated_text = None
-            except Exception as e:
-                # don't crash translation: log and continue
-                print("❌ Translation error:", e)
-                translated_text = None
-
-            # 4) Summarize legal text (use full extracted_text to preserve details)
-            try:
-                summary = summarize_legal_text(extracted_text)
-            except Exception as e:
-                print("⚠️ Summarization error:", e)
-                summary = "⚠️ Summarization unavailable."
-
-            # 5) Term explanations (optional toggle)
-            term_explanations = {}
-            if ENABLE_TERM_EXPLANATIONS and HAS_EXPLAIN_TERMS:
-                try:
-                    term_explanations = explain_terms(extracted_text)
-                except Exception as e:
-                    print("⚠️ explain_terms error:", e)
-                    term_explanations = {}
-            else:
-                term_explanations = {}
-
-            # 6) Crime classification (safe)
-            try:
-                crime_type, severity = predict_crime(simplified_text)
-            except Exception as e:
-                print("⚠️ crime classification error:", e)
-                crime_type, severity = ("Unknown", "Unknown")
-
-            # 7) Outcome prediction (rule based)
-            try:
-                crime_outcome = predict_outcome(simplified_text)
-            except Exception as e:
-                print("⚠️ outcome predictor error:", e)
-                crime_outcome = "Outcome unavailable."
-
-            # 8) Extract IPC sections
-            try:
-                ipc_results = extract_ipc_sections(extracted_text)
-            except Exception as e:
-                print("⚠️ ipc extraction error:", e)
-                ipc_results = []
-
-            # 9) Generate audio for the translated text if present else for simplified_text
-            audio_file = None
-            try:
-                text_for_tts = translated_text if translated_text else simplified_text
-                # ensure text_for_tts is not an error message
-                if text_for_tts and not text_for_tts.startswith(("❌", "⚠️")):
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    out_filename = f"output_fir_{timestamp}.mp3"
-                    saved_filename = text_to_speech(text_for_tts, lang=user_language, filename=out_filename)
-                    # text_to_speech should save into static/ and return filename or full path
-                    # If tts returns full path, get basename for url_for
-                    if saved_filename:
-                        audio_file = os.path.basename(saved_filename)
-            except Exception as e:
-                print("⚠️ TTS error:", e)
-                audio_file = None
-
-            # Cleanup uploaded file (we keep audio)
-            safe_remove(filepath)
-            filepath = None
-
-            return render_template(
-                "result.html",
-                extracted_text=extracted_text,
-                simplified_text=simplified_text,
-                translated_text=translated_text,
-                user_language=user_language,
-                audio_file=audio_file,
-                crime_type=crime_type,
-                severity=severity,
-                crime_outcome=crime_outcome,
-                ipc_results=ipc_results,
-                summary=summary,
-                term_explanations=term_explanations,
-                error=None
-            )
+            upload, user_language, error = save_upload()
+            if error:
+                return render_template('result.html', error=error)
+
+            # OCR / text extraction, then simplify, translate, summarize, classify,
+            # extract IPC sections and generate audio (see modules/fir_pipeline.py)
+            context, timings, error = process_upload(upload, user_language)
+            if error:
+                return render_template('result.html', error=error)
+
+            if config.RESULT_TIMINGS or request.values.get('timings') == '1':
+                context['stage_timings'] = sorted(timings.items(), key=lambda item: -item[1])
+                context['total_seconds'] = time.perf_counter() - g.request_start
+            return render_template("result.html", error=None, **context)
 
         except Exception as e:
             traceback.print_exc()
-            # try to remove file if it was saved
-            if filepath:
-                safe_remove(filepath)
             return render_template('result.html', error=f"⚠️ Internal Error: {str(e)}")
+        finally:
+            # Free the in-memory / spooled upload (we keep audio)
+            close_upload(upload)
 
     # GET
     return render_template('index.html')
 
 
+def _run_upload_job(job, upload, user_language):
+    first_content = []
+
+    def _first_content():
+        if not first_content:
+            first_content.append(True)
+            metrics.observe("fir_first_content_seconds", time.time() - job.created_at)
+
+    def on_stage_done(name, fields, seconds):
+        if name == "extracted_text":
+            _first_content()
+        job.add_event(name, {"fields": fields, "seconds": round(seconds, 3)})
+
+    def on_token(piece):
+        if piece is None:
+            # The simplification fell back and starts over
+            job.add_event("token_reset", {})
+            return
+        _first_content()
+        job.add_event("token", {"text": piece})
+
+    try:
+        context, timings, error = process_upload(upload, user_language,
+                                                 on_stage_done=on_stage_done, on_token=on_token)
+    finally:
+        close_upload(upload)
+    if error:
+        raise RuntimeError(error)
+    return {"context": context, "timings": {k: round(v, 3) for k, v in timings.items()}}
+
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """
+    Accepts the same form as '/' and processes it in the background.
+    Returns 202 with the job id, or 429 when the queue is full.
+    """
+    upload, user_language, error = save_upload()
+    if error:
+        return jsonify({'error': error}), 400
+
+    try:
+        job = jobs.submit(_run_upload_job, upload, user_language)
+    except jobs.JobQueueFull:
+        close_upload(upload)
+        response = jsonify({'error': 'Server busy, please retry shortly.'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+
+    return jsonify({
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id),
+    }), 202
+
+
+@app.route('/stream', methods=['POST'])
+def stream_upload():
+    """
+    Same form as '/', but answers at once with a result page that fills itself in from the
+    job's event stream: extracted text, simplified-text tokens as they are generated, then
+    each remaining stage as it finishes.
+    """
+    upload, user_language, error = save_upload()
+    if error:
+        return render_template('result.html', error=error), 400
+    try:
+        job = jobs.submit(_run_upload_job, upload, user_language)
+    except jobs.JobQueueFull:
+        close_upload(upload)
+        return render_template('result.html', error="⚠️ Server busy, please retry shortly."), 429
+    return render_template('result.html', error=None, user_language=user_language,
+                           events_url=url_for('job_events', job_id=job.id))
+
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Server-Sent Events: one event per finished stage with its partial result,
+    then a final 'done' or 'failed' event. Past events are replayed on connect; each event's
+    id is its position, so a reconnecting EventSource (Last-Event-ID) resumes after the last
+    one it received instead of getting everything twice.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    last_id = request.headers.get('Last-Event-ID', '')
+    start = int(last_id) if last_id.isdigit() else 0
+
+    def stream():
+        sent = start
+        while True:
+            events, finished = job.wait_events(sent, timeout=15)
+            for i, e in enumerate(events, sent + 1):
+                yield sse_event(e['event'], e['data'], event_id=i)
+            sent += len(events)
+            if finished and not events:
+                return
+            if not events:
+                # keep-alive comment so proxies don't drop the connection
+                yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(stream()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def _partial_audio(state):
+    """
+    Response for audio that is still being synthesized chunk by chunk, or None if it has just
+    been finished. 'bytes=0-' (what audio elements send first) and plain requests get the whole
+    file streamed as it grows; other ranges get the part of the range already written (206,
+    total length '*' since it is not known yet).
+    """
+    start, end = 0, None
+    ranges = request.range.ranges if request.range and request.range.units == 'bytes' else []
+    if len(ranges) == 1 and ranges[0][0] >= 0:
+        start, end = ranges[0]
+    try:
+        if start == 0 and end is None:
+            body = audio_store.iter_partial(state)
+            response = Response(stream_with_context(body), mimetype='audio/mpeg')
+        else:
+            data = audio_store.read_partial(state, start, end)
+            if not data:
+                return Response(status=416, headers={'Content-Range': 'bytes */*'})
+            response = Response(data, status=206, mimetype='audio/mpeg')
+            response.headers['Content-Range'] = f"bytes {start}-{start + len(data) - 1}/*"
+    except FileNotFoundError:
+        return None
+    response.headers['Accept-Ranges'] = 'bytes'
+    # Not the final file yet: don't let the browser keep a possibly truncated copy
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/audio/<path:filename>')
+def audio(filename):
+    state = audio_store.partial(filename)
+    if state is not None:
+        response = _partial_audio(state)
+        if response is not None:
+            return response
+    # Audio files are named by a hash of their content, so browsers may cache them for good.
+    # conditional=True answers Range requests (206) for seeking.
+    response = send_from_directory(config.AUDIO_DIR, filename, mimetype='audio/mpeg',
+                                   max_age=config.AUDIO_CACHE_MAX_AGE, conditional=True)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
 @app.route('/define_word', methods=['POST'])
 def define_word():
     word = request.form.get('word', '').strip()
@@ -198,41 +330,158 @@ def define_word():
         print("⚠️ dictionary_helper error:", e)
         meaning = "Meaning not found."
 
-    # translate meaning if requested and a translator is available
-    if user_language != 'en' and meaning and meaning != "Meaning not found.":
-        try:
-            translated_meaning = translate_to_language(meaning, user_language)
-            if translated_meaning and not translated_meaning.startswith("❌"):
-                meaning = translated_meaning
-        except Exception as e:
-            print("⚠️ meaning translation error:", e)
+    # translate meaning if requested
+    if user_language != 'en':
+        meaning = translate_meanings({word: meaning}, user_language)[word]
 
     return jsonify({'meaning': meaning})
 
 
+@app.route('/define_words', methods=['POST'])
+def define_words():
+    """
+    Meanings for a list of words in one round-trip.
+    JSON {"words": [...], "language": "hi"} -> {"meanings": {word: meaning}}
+    """
+    payload = request.get_json(silent=True) or {}
+    words = payload.get('words')
+    user_language = payload.get('language', 'en') or 'en'
+    if not isinstance(words, list) or not words or not all(isinstance(w, str) for w in words):
+        return jsonify({'error': 'No words provided'}), 400
+
+    words = list(dict.fromkeys(w.strip() for w in words if w.strip()))
+    try:
+        meanings = get_word_meanings(words)
+    except Exception as e:
+        print("⚠️ dictionary_helper error:", e)
+        meanings = {w: "Meaning not found." for w in words}
+
+    if user_language != 'en':
+        meanings = translate_meanings(meanings, user_language)
+
+    return jsonify({'meanings': meanings})
+
+
 @app.route('/get_ipc_details', methods=['POST'])
 def get_ipc_details():
-    ipc_section = request.form.get('ipc_section', '').strip().upper().replace("IPC ", "")
+    ipc_section = normalize_section(request.form.get('ipc_section', ''))
     if not ipc_section:
         return jsonify({'error': 'No IPC section provided'})
 
     try:
-        ipc_data = load_ipc_data()
+        details = get_section(ipc_section)
     except Exception as e:
         print("⚠️ load_ipc_data error:", e)
         return jsonify({'error': 'IPC data not available on server'})
 
-    if ipc_section in ipc_data:
-        details = ipc_data[ipc_section]
-        return jsonify({
-            'section': f"IPC {ipc_section}",
-            'description': details.get('description', 'No description available'),
-            'punishment': details.get('punishment', 'No punishment available')
-        })
+    if details:
+        return jsonify(details)
 
     return jsonify({'error': 'IPC section not found'})
 
 
+@app.route('/api/ipc_sections', methods=['POST'])
+def ipc_sections_bulk():
+    """
+    Details for many sections in one call.
+    Accepts JSON {"sections": ["379", "IPC 420", ...]} or a comma-separated 'sections' form field.
+    """
+    payload = request.get_json(silent=True) or {}
+    sections = payload.get('sections')
+    if sections is None:
+        sections = [s for s in request.form.get('sections', '').split(',') if s.strip()]
+    if not isinstance(sections, list) or not sections:
+        return jsonify({'error': 'No IPC sections provided'}), 400
+
+    try:
+        found = get_sections(sections)
+    except Exception as e:
+        print("⚠️ load_ipc_data error:", e)
+        return jsonify({'error': 'IPC data not available on server'}), 503
+
+    found_ids = {d['section'] for d in found}
+    missing = [s for s in sections if f"IPC {normalize_section(s)}" not in found_ids]
+    return jsonify({'sections': found, 'not_found': missing})
+
+
+def parse_texts_payload():
+    """
+    Texts from a JSON list, a JSON object {"texts": [...]}, or JSONL
+    (one JSON string or {"text": ...} object per line). Returns (texts, error).
+    """
+    raw = request.get_data(as_text=True) or ''
+    try:
+        if request.mimetype in ('application/jsonl', 'application/x-ndjson'):
+            items = [json.loads(line) for line in raw.splitlines() if line.strip()]
+        else:
+            items = json.loads(raw) if raw.strip() else None
+            if isinstance(items, dict):
+                items = items.get('texts')
+    except ValueError as e:
+        return None, f"Invalid JSON: {e}"
+
+    if not isinstance(items, list) or not items:
+        return None, "Expected a non-empty list of texts"
+    texts = [item.get('text', '') if isinstance(item, dict) else item for item in items]
+    if not all(isinstance(t, str) for t in texts):
+        return None, "Every item must be a string or an object with a 'text' field"
+    return texts, None
+
+
+@app.route('/api/classify', methods=['POST'])
+def classify_batch():
+    texts, error = parse_texts_payload()
+    if error:
+        return jsonify({'error': error}), 400
+    try:
+        results = predict_crime_batch(texts)
+    except Exception as e:
+        print("⚠️ crime classification error:", e)
+        return jsonify({'error': 'Classifier not available on server'}), 503
+    return jsonify({'count': len(results), 'results': results})
+
+
+@app.route('/api/outcomes', methods=['POST'])
+def outcomes_batch():
+    """
+    Every outcome rule that fires for each text, with evidence. Same payload formats as /api/classify;
+    an optional ?jurisdiction= enables jurisdiction-specific rules.
+    """
+    texts, error = parse_texts_payload()
+    if error:
+        return jsonify({'error': error}), 400
+    results = evaluate_rules_batch(texts, request.args.get('jurisdiction'))
+    return jsonify({'count': len(results), 'results': results})
+
+
+@app.route('/models', methods=['GET'])
+def models_status():
+    report = model_registry.memory_report()
+    report['classifier'] = classifier_info()
+    return jsonify(report)
+
+
+@app.route('/models/warm_up', methods=['POST'])
+def models_warm_up():
+    return jsonify(model_registry.warm_up())
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    """
+    Prometheus text format: stage and backend latency histograms, request counts,
+    cache hit rates, model load times and job queue depth.
+    """
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    stats = result_cache.stats()
+    stats['audio'] = audio_store.usage()
+    return jsonify(stats)
+
+
 if __name__ == '__main__':
     # You can disable debug when deploying
     app.run(host='0.0.0.0', port=5001, debug=True)
@@ -0,0 +1,50 @@
+"""
+Throughput of predict_crime (one text per call) vs predict_crime_batch.
+
+    python -m benchmarks.bench_classifier --n 20000
+"""
+import argparse
+import csv
+import time
+
+from modules.classifier import predict_crime, predict_crime_batch
+
+
+def load_texts(path, n):
+    with open(path, "r", encoding="utf-8") as f:
+        texts = [row[0] for row in csv.reader(f) if row]
+    # Repeat the dataset up to n rows
+    return [texts[i % len(texts)] for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", default="crime_dataset.csv")
+    parser.add_argument("--n", type=int, default=5000, help="number of texts to classify")
+    parser.add_argument("--single-n", type=int, default=500,
+                        help="texts used for the per-item path (it is much slower)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+
+    texts = load_texts(args.dataset, args.n)
+    single = texts[:args.single_n]
+
+    start = time.perf_counter()
+    single_labels = [predict_crime(t) for t in single]
+    single_rate = len(single) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batch = predict_crime_batch(texts, chunk_size=args.chunk_size)
+    batch_rate = len(texts) / (time.perf_counter() - start)
+
+    mismatches = sum(
+        1 for (t, s), b in zip(single_labels, batch) if (str(t), str(s)) != (b["crime_type"], b["severity"])
+    )
+    print(f"per-item : {single_rate:10.1f} texts/s  ({len(single)} texts)")
+    print(f"batch    : {batch_rate:10.1f} texts/s  ({len(texts)} texts)")
+    print(f"speed-up : {batch_rate / single_rate:10.1f}x")
+    print(f"label mismatches on the first {len(single)} texts: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
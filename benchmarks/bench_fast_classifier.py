@@ -0,0 +1,113 @@
+"""
+Classifier serving cost: the scikit-learn bundle vs the NumPy fast-path export.
+
+    python train.py                                      # writes both files
+    python -m benchmarks.bench_fast_classifier --repeat 3
+
+Each path runs in its own process so import time and peak memory are measured separately.
+Labels of both paths are compared on the training dataset.
+"""
+import argparse
+import json
+import math
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import config
+
+PATHS = ("sklearn", "fast")
+
+
+def percentile(values, p):
+    # Nearest-rank percentile
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def load_texts(path):
+    # Plain csv module: importing pandas here would skew the import / memory numbers
+    import csv
+
+    with open(path, "r", encoding="utf-8") as f:
+        return [row[0] for row in csv.reader(f) if row]
+
+
+def run_path(path, texts, repeat):
+    """
+    Child-process body: imports and loads one path, then classifies every text one call at a time.
+    """
+    start = time.perf_counter()
+    if path == "fast":
+        from modules.fast_classifier import FastClassifier
+
+        model = FastClassifier(config.CLASSIFIER_FAST_PATH)
+        predict = lambda text: model.predict([text])[0]
+    else:
+        from modules import model_bundle
+
+        bundle = model_bundle.load_bundle(config.CLASSIFIER_BUNDLE_PATH)
+        vectorizer, type_model, severity_model = (
+            bundle["vectorizer"], bundle["crime_type_model"], bundle["severity_model"])
+
+        def predict(text):
+            X = vectorizer.transform([text])
+            return str(type_model.predict(X)[0]), str(severity_model.predict(X)[0])
+    load_seconds = time.perf_counter() - start
+
+    latencies, labels = [], []
+    for text in texts:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            label = predict(text)
+            latencies.append(time.perf_counter() - start)
+        labels.append(list(label))
+
+    # ru_maxrss is KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"path": path, "load_seconds": load_seconds, "latencies": latencies, "peak_mb": peak_mb,
+                      "labels": labels, "sklearn_imported": "sklearn" in sys.modules,
+                      "scipy_imported": "scipy" in sys.modules}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", default="crime_dataset.csv")
+    parser.add_argument("--repeat", type=int, default=1, help="calls per text (latency samples)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    texts = load_texts(args.dataset)
+    if args.child:
+        run_path(args.child, texts, args.repeat)
+        return
+
+    results = {}
+    for path in PATHS:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_fast_classifier", "--dataset", args.dataset,
+             "--repeat", str(args.repeat), "--child", path],
+            capture_output=True, text=True,
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{path:<8} failed: {(proc.stderr.strip().splitlines() or ['unknown error'])[-1]}")
+            continue
+        results[path] = json.loads(lines[-1])
+
+    print(f"\n{len(texts)} texts x {args.repeat} call(s)\n")
+    print(f"{'path':<8} {'load ms':>8} {'p50 us':>8} {'p95 us':>8} {'peak MB':>8} {'sklearn':>8} {'scipy':>6}")
+    for path, r in results.items():
+        print(f"{path:<8} {r['load_seconds'] * 1000:8.0f} "
+              f"{statistics.median(r['latencies']) * 1e6:8.0f} {percentile(r['latencies'], 95) * 1e6:8.0f} "
+              f"{r['peak_mb']:8.0f} {str(r['sklearn_imported']):>8} {str(r['scipy_imported']):>6}")
+
+    if len(results) == len(PATHS):
+        same = sum(a == b for a, b in zip(results["sklearn"]["labels"], results["fast"]["labels"]))
+        print(f"\nidentical labels: {same}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
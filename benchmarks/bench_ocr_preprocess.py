@@ -0,0 +1,90 @@
+"""
+OCR latency vs character accuracy, with and without image preprocessing.
+
+    python -m benchmarks.bench_ocr_preprocess                     # synthetic phone-photo pages from uploads/FIR_*.txt
+    python -m benchmarks.bench_ocr_preprocess --images scans/     # real images; ground truth in <name>.txt next to each
+
+Needs the Tesseract binary (TESSERACT_PATH).
+"""
+import argparse
+import difflib
+import glob
+import os
+import statistics
+import textwrap
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+import config
+from modules.ocr_extractor import ocr_image
+
+
+def synthesize_pages(pattern, size=(4000, 3000), skew=2.5):
+    """
+    Renders each FIR text as a large, slightly rotated photo-like page (about 12 MP).
+    """
+    pages = []
+    font = ImageFont.load_default(size=size[0] // 60)
+    for path in sorted(glob.glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            truth = f.read().strip()
+        img = Image.new("RGB", size, (235, 232, 225))
+        draw = ImageDraw.Draw(img)
+        y = size[1] // 10
+        for line in truth.splitlines():
+            for wrapped in textwrap.wrap(line, 70) or [""]:
+                draw.text((size[0] // 10, y), wrapped, fill=(30, 30, 30), font=font)
+                y += int(font.size * 1.5)
+        pages.append((os.path.basename(path), img.rotate(skew, fillcolor=(235, 232, 225)), truth))
+    return pages
+
+
+def load_images(folder):
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, "*"))):
+        base, ext = os.path.splitext(path)
+        if ext.lower() not in (".png", ".jpg", ".jpeg") or not os.path.exists(base + ".txt"):
+            continue
+        with open(base + ".txt", "r", encoding="utf-8") as f:
+            truth = f.read().strip()
+        pages.append((os.path.basename(path), Image.open(path), truth))
+    return pages
+
+
+def char_accuracy(truth, text):
+    return difflib.SequenceMatcher(None, " ".join(truth.split()), " ".join(text.split())).ratio()
+
+
+def run(pages, label, preprocess, max_side=None):
+    if max_side:
+        config.OCR_MAX_SIDE = max_side
+    latencies, accuracies = [], []
+    for _, image, truth in pages:
+        start = time.perf_counter()
+        text, _timings = ocr_image(image, preprocess=preprocess)
+        latencies.append(time.perf_counter() - start)
+        accuracies.append(char_accuracy(truth, text))
+    print(f"{label:<28} p50 {statistics.median(latencies) * 1000:8.0f} ms   "
+          f"max {max(latencies) * 1000:8.0f} ms   char accuracy {statistics.mean(accuracies) * 100:6.2f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--images", help="folder of images with <name>.txt ground truth")
+    parser.add_argument("--fixtures", default="uploads/FIR_*.txt", help="texts to render when --images is not given")
+    parser.add_argument("--max-sides", default="1600,2500,3500", help="OCR_MAX_SIDE values to compare")
+    args = parser.parse_args()
+
+    pages = load_images(args.images) if args.images else synthesize_pages(args.fixtures)
+    if not pages:
+        raise SystemExit("No benchmark images found.")
+    print(f"{len(pages)} page(s)\n")
+
+    run(pages, "raw (no preprocessing)", preprocess=False)
+    for side in (int(s) for s in args.max_sides.split(",")):
+        run(pages, f"preprocessed, max side {side}", preprocess=True, max_side=side)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+Per-stage and end-to-end benchmark of the upload pipeline, fully offline.
+
+    python -m benchmarks.bench_pipeline                      # compare with the stored baseline
+    python -m benchmarks.bench_pipeline --save-baseline      # record a new baseline (3 passes)
+    python -m benchmarks.bench_pipeline --realistic          # inject typical network latencies
+
+Gemini, googletrans, gTTS and the BART summarizer are replaced by the deterministic fakes
+in benchmarks/fakes.py. Fixtures are uploads/FIR_*.txt, crime_dataset.csv and
+benchmarks/fixtures/ (a three-page PDF with a text layer for pdfplumber and a scanned page
+for Tesseract; the "ocr" stage is skipped when Tesseract is not installed). The classifier
+is trained into a temporary directory from crime_dataset.csv. Caches (result cache,
+translation memory, audio store) are emptied before every call, so each call does the full work.
+Exits with status 1 when a stage's latency (lower quartile of the per-round medians, relative
+to a fixed calibration workload timed in the same run) or peak memory regresses past the
+baseline by more than the tolerance and the stage's measured noise, or when a pipeline stage
+fell back after an error (a fast fallback is not a speed-up). A baseline recorded on another
+machine (CPU, core count, Python version) or with other settings is not compared against.
+"""
+import argparse
+import contextlib
+import csv
+import gc
+import glob
+import io
+import json
+import math
+import os
+import platform
+import re
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import config
+from modules import metrics
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "bench_pipeline.json")
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+PDF_FIXTURE = os.path.join(FIXTURE_DIR, "FIR_text_layer.pdf")
+SCAN_FIXTURE = os.path.join(FIXTURE_DIR, "FIR_scan.png")
+
+# Seconds per call injected by --realistic
+REALISTIC = {"gemini_latency": 0.8, "translate_latency": 0.15, "tts_latency": 0.3, "summarizer_latency": 0.0}
+
+# Latency floors (ms) for stages bound by file I/O and the page-worker processes rather than the
+# CPU; on one core they ranged from about 45 to 85 ms between identical runs
+STAGE_FLOOR_MS = {"pdf": 40.0, "ocr": 60.0, "pipeline_pdf": 40.0}
+
+
+def percentile(values, p):
+    # Nearest-rank percentile
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def machine_fingerprint():
+    """
+    What the timings depend on besides the code. Baselines from another machine are not compared.
+    """
+    return {"cpu": cpu_model(), "cpus": os.cpu_count(), "python": platform.python_version()}
+
+
+def calibrate(runs=10):
+    """
+    Best time (ms) of a fixed pure-Python workload (tokenising and counting, like the NLP stages).
+    Stage timings are compared as multiples of it, so a machine that is uniformly slower in this
+    run (frequency scaling, a busy neighbour) doesn't read as a regression.
+    """
+    text = " ".join(f"section{i % 97} accused{i % 31}" for i in range(20000))
+    best = float("inf")
+    # Collections would make it depend on how much the stages left on the heap
+    gc.disable()
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            counts = {}
+            for token in re.findall(r"\w+", text):
+                counts[token] = counts.get(token, 0) + 1
+            sorted(counts.items(), key=lambda kv: kv[1])
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best * 1000
+
+
+def isolate_storage(workdir):
+    """
+    Points the SQLite database, audio store and classifier files at a scratch directory.
+    """
+    config.DATABASE_PATH = os.path.join(workdir, "bench.sqlite3")
+    config.AUDIO_DIR = os.path.join(workdir, "audio")
+    config.CLASSIFIER_BUNDLE_PATH = os.path.join(workdir, "classifier.joblib")
+    config.CLASSIFIER_FAST_PATH = os.path.join(workdir, "classifier_fast.npz")
+    # The result cache is switched off rather than emptied: nothing is written to it at all
+    config.RESULT_CACHE_ENABLED = False
+
+
+def reset_caches():
+    from database import models
+    from modules import audio_store, translator
+
+    # Chunked TTS keeps appending after text_to_speech returns
+    audio_store.wait_pending()
+    translator._memory.clear()
+    models.get_connection().execute("DELETE FROM translation_memory")
+    models.get_connection().commit()
+    shutil.rmtree(config.AUDIO_DIR, ignore_errors=True)
+
+
+def train_classifier(dataset):
+    import train
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        train.main(["--dataset", dataset, "--bundle", config.CLASSIFIER_BUNDLE_PATH, "--n-jobs", "1", "--no-cache"])
+
+
+def load_fixtures(pattern, dataset):
+    paths = sorted(glob.glob(pattern))
+    if not paths:
+        raise SystemExit(f"No fixtures match {pattern}")
+    texts = [open(p, encoding="utf-8").read() for p in paths]
+    with open(dataset, "r", encoding="utf-8") as f:
+        rows = [row[0] for row in csv.reader(f) if row]
+    return paths, texts, rows
+
+
+def tesseract_available():
+    import pytesseract
+
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def build_cases(paths, texts, rows, lang, ocr):
+    """
+    (stage name, function, inputs). Each function takes one input.
+    """
+    from modules.classifier import predict_crime
+    from modules.fir_pipeline import run_upload
+    from modules.fir_simplifier import simplify_fir_text
+    from modules.ipc_explainer import extract_ipc_sections
+    from modules.legal_summarizer import summarize_legal_text
+    from modules.ocr_extractor import extract_text
+    from modules.translator import translate_to_language
+    from modules.tts_generator import text_to_speech
+
+    cases = [
+        ("extract", extract_text, paths),
+        ("pdf", extract_text, [PDF_FIXTURE]),
+        ("simplify", simplify_fir_text, texts),
+        ("translate", lambda t: translate_to_language(t, lang), texts),
+        ("summary", summarize_legal_text, texts),
+        ("classify", predict_crime, rows),
+        ("ipc", extract_ipc_sections, texts + rows),
+        ("tts", lambda t: text_to_speech(t, lang), texts),
+        ("pipeline", lambda p: run_upload(p, lang), paths),
+        ("pipeline_pdf", lambda p: run_upload(p, lang), [PDF_FIXTURE]),
+    ]
+    if ocr:
+        cases.insert(2, ("ocr", extract_text, [SCAN_FIXTURE]))
+    return cases
+
+
+def measure(func, inputs, repeat):
+    """
+    Latencies of every call (caches reset before each), then one traced pass for peak memory.
+    round_ms is the lower quartile of the per-round medians: it favours the rounds least disturbed
+    by the rest of the machine without hanging on one lucky round. The regression check compares it,
+    allowing for spread_ms, the interquartile range of the rounds.
+    """
+    latencies = []
+    rounds = []
+    wall = 0.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start_round = len(latencies)
+            for item in inputs:
+                reset_caches()
+                start = time.perf_counter()
+                result = func(item)
+                elapsed = time.perf_counter() - start
+                if isinstance(result, str) and result.startswith("❌"):
+                    # An extraction error returns instantly; don't time it as a result
+                    raise SystemExit(result)
+                latencies.append(elapsed)
+                wall += elapsed
+            rounds.append(statistics.median(latencies[start_round:]))
+
+        tracemalloc.start()
+        for item in inputs:
+            reset_caches()
+            func(item)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "calls": len(latencies),
+        "throughput": len(latencies) / wall if wall else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "round_ms": percentile(rounds, 25) * 1000,
+        "spread_ms": (percentile(rounds, 75) - percentile(rounds, 25)) * 1000,
+        "peak_kb": peak / 1024,
+    }
+
+
+def merge_passes(passes):
+    """
+    One result per stage from several passes over all stages: the median pass, with spread_ms
+    widened to half the range of round_ms across passes, which is the noise between runs.
+    """
+    merged = {}
+    for stage in passes[0]:
+        runs = sorted((p[stage] for p in passes), key=lambda r: r["round_ms"])
+        r = dict(runs[len(runs) // 2])
+        r["spread_ms"] = max(max(run["spread_ms"] for run in runs),
+                             (runs[-1]["round_ms"] - runs[0]["round_ms"]) / 2)
+        merged[stage] = r
+    return merged
+
+
+def compare(results, baseline, calibration_ms, tolerance, floor_ms, floor_kb):
+    """
+    Stages whose round latency or peak memory grew by more than tolerance. Latencies are
+    compared relative to the calibration workload: the baseline is scaled by how much slower or
+    faster calibration ran this time. The floors only absorb noise and are not added to the
+    tolerance, so sub-millisecond stages are checked too: floor_ms (timer resolution), twice the
+    round spread of either run (a busy machine), or STAGE_FLOOR_MS for the I/O-bound stages.
+    """
+    scale = calibration_ms / baseline["calibration_ms"] if baseline.get("calibration_ms") else 1.0
+    regressions = []
+    for stage, r in results.items():
+        base = baseline.get("stages", {}).get(stage)
+        if base is None:
+            continue
+        expected = base["round_ms"] * scale
+        spread = max(base.get("spread_ms", 0.0), r["spread_ms"])
+        floor = max(floor_ms, 2 * spread, STAGE_FLOOR_MS.get(stage, 0.0))
+        if r["round_ms"] > max(expected * (1 + tolerance), expected + floor):
+            regressions.append(f"{stage}: {base['round_ms']:.3f} -> {r['round_ms']:.3f} ms "
+                               f"(calibration x{scale:.2f})")
+        if r["peak_kb"] > max(base["peak_kb"] * (1 + tolerance), base["peak_kb"] + floor_kb):
+            regressions.append(f"{stage}: peak {base['peak_kb']:.0f} -> {r['peak_kb']:.0f} KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fixtures", default="uploads/FIR_*.txt")
+    parser.add_argument("--dataset", default="crime_dataset.csv")
+    parser.add_argument("--lang", default="hi", help="target language for translation and TTS")
+    # Rounds; the sub-millisecond stages need about this many for a steady round_ms
+    parser.add_argument("--repeat", type=int, default=15)
+    parser.add_argument("--stages", default="", help="comma-separated subset of stages")
+    parser.add_argument("--realistic", action="store_true", help="inject typical network latencies")
+    parser.add_argument("--no-gemini", action="store_true", help="simplify with the (fake) summarizer instead")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--passes", type=int, default=None,
+                        help="passes over all stages (default 3 with --save-baseline, else 1)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression")
+    parser.add_argument("--floor-ms", type=float, default=0.02, help="ignore latency changes below this (timer noise)")
+    parser.add_argument("--floor-kb", type=float, default=16, help="ignore peak memory changes below this")
+    args = parser.parse_args()
+    if args.passes is None:
+        args.passes = 3 if args.save_baseline else 1
+
+    ocr = tesseract_available()
+    settings = {"realistic": args.realistic, "gemini": not args.no_gemini, "lang": args.lang, "tesseract": ocr,
+                "repeat": args.repeat, "machine": machine_fingerprint()}
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    try:
+        isolate_storage(workdir)
+        # Failed stages are found through the error counter, which records nothing when metrics are off
+        config.METRICS_ENABLED = True
+        from benchmarks import fakes
+
+        fakes.install(**(REALISTIC if args.realistic else {}), gemini=not args.no_gemini)
+        train_classifier(args.dataset)
+
+        paths, texts, rows = load_fixtures(args.fixtures, args.dataset)
+        wanted = set(args.stages.split(",")) if args.stages else None
+        passes = []
+        # Calibrated between stages too, keeping the quietest: one sample lands on a busy moment easily
+        calibration_ms = calibrate()
+        print(f"{len(paths)} fixtures, {len(rows)} dataset rows, repeat={args.repeat}, settings={settings}")
+        if not ocr:
+            print("Tesseract not found (TESSERACT_PATH); skipping the ocr stage.")
+        print()
+        for n in range(args.passes):
+            if args.passes > 1:
+                print(f"pass {n + 1}/{args.passes}")
+            print(f"{'stage':<12} {'calls':>6} {'calls/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'round ms':>9} {'peak KB':>9}")
+            passes.append({})
+            for stage, func, inputs in build_cases(paths, texts, rows, args.lang, ocr):
+                if wanted and stage not in wanted:
+                    continue
+                calibration_ms = min(calibration_ms, calibrate())
+                r = passes[-1][stage] = measure(func, inputs, args.repeat)
+                print(f"{stage:<12} {r['calls']:>6} {r['throughput']:9.1f} {r['p50_ms']:9.2f} "
+                      f"{r['p95_ms']:9.2f} {r['round_ms']:9.2f} {r['peak_kb']:9.0f}")
+        results = merge_passes(passes)
+        calibration_ms = min(calibration_ms, calibrate())
+        print(f"\ncalibration: {calibration_ms:.2f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    # ru_maxrss is KiB on Linux
+    print(f"\nprocess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+    errors = metrics.counter_values("fir_stage_errors_total")
+    if errors:
+        print("\n❌ Pipeline stages failed and used their fallback:")
+        for labels, count in sorted(errors.items()):
+            print(f"   {dict(labels)['stage']}: {count} call(s)")
+        sys.exit(1)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "calibration_ms": calibration_ms, "stages": results}, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print("No baseline yet; run with --save-baseline to record one.")
+        return
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("settings") != settings:
+        print(f"Baseline was recorded with {baseline.get('settings')}; not comparing.")
+        return
+    regressions = compare(results, baseline, calibration_ms, args.tolerance, args.floor_ms, args.floor_kb)
+    if regressions:
+        print("\n❌ Regressions against the baseline:")
+        for line in regressions:
+            print("   " + line)
+        sys.exit(1)
+    print("\n✅ No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
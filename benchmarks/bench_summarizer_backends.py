@@ -0,0 +1,112 @@
+"""
+Summarizer latency, peak memory and ROUGE drift per inference backend.
+
+    python -m benchmarks.bench_summarizer_backends                   # pytorch, int8 and onnx
+    python -m benchmarks.bench_summarizer_backends --backends pytorch,int8 --repeat 3
+
+Each backend runs in its own process so peak memory is measured separately.
+Drift is ROUGE of each backend's summaries against the fp32 (pytorch) summaries;
+ROUGE against the reference simplifications in evaluation_dataset.csv is shown too.
+"""
+import argparse
+import csv
+import json
+import math
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+from modules.evaluation import rouge_scores
+
+
+def load_dataset(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [(row["original_text"], row["reference_simplified"]) for row in csv.DictReader(f)]
+
+
+def percentile(values, p):
+    # Nearest-rank percentile
+    values = sorted(values)
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def run_backend(backend, dataset, repeat):
+    """
+    Child-process body: loads one backend and summarizes the dataset. Prints one JSON line.
+    """
+    from modules.inference_backends import load_summarizer
+    from modules.long_summarizer import summarize
+
+    start = time.perf_counter()
+    summarizer = load_summarizer(backend)
+    load_seconds = time.perf_counter() - start
+
+    latencies, outputs = [], []
+    for original, _ in dataset:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            summary, _report = summarize(summarizer, original, max_length=150, min_length=50)
+            latencies.append(time.perf_counter() - start)
+        outputs.append(summary)
+
+    # ru_maxrss is KiB on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"backend": backend, "load_seconds": load_seconds, "latencies": latencies,
+                      "peak_mb": peak_mb, "outputs": outputs}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--dataset", default="evaluation_dataset.csv")
+    parser.add_argument("--backends", default="pytorch,int8,onnx")
+    parser.add_argument("--repeat", type=int, default=1, help="summaries per row (latency samples)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    dataset = load_dataset(args.dataset)
+    if args.child:
+        run_backend(args.child, dataset, args.repeat)
+        return
+
+    backends = args.backends.split(",")
+    if "pytorch" not in backends:
+        backends.insert(0, "pytorch")  # the fp32 baseline for drift
+
+    results = {}
+    for backend in backends:
+        proc = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_summarizer_backends", "--dataset", args.dataset,
+             "--repeat", str(args.repeat), "--child", backend],
+            capture_output=True, text=True,
+        )
+        lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+        if proc.returncode != 0 or not lines:
+            print(f"{backend:<8} failed: {(proc.stderr.strip().splitlines() or ['unknown error'])[-1]}")
+            continue
+        results[backend] = json.loads(lines[-1])
+
+    if "pytorch" not in results:
+        raise SystemExit("The pytorch baseline failed; nothing to compare against.")
+    baseline = results["pytorch"]["outputs"]
+    references = [ref for _, ref in dataset]
+
+    print(f"\n{len(dataset)} texts x {args.repeat} run(s)\n")
+    print(f"{'backend':<8} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'peak MB':>8} "
+          f"{'drift R1':>9} {'drift RL':>9} {'ref R1':>7} {'ref RL':>7}")
+    for backend, r in results.items():
+        drift = [rouge_scores(b, o) for b, o in zip(baseline, r["outputs"])]
+        vs_ref = [rouge_scores(ref, o) for ref, o in zip(references, r["outputs"])]
+        print(f"{backend:<8} {r['load_seconds']:7.1f} "
+              f"{statistics.median(r['latencies']) * 1000:8.0f} {percentile(r['latencies'], 95) * 1000:8.0f} "
+              f"{r['peak_mb']:8.0f} "
+              f"{1 - statistics.mean(d['rouge1'] for d in drift):9.3f} "
+              f"{1 - statistics.mean(d['rougeL'] for d in drift):9.3f} "
+              f"{statistics.mean(v['rouge1'] for v in vs_ref):7.3f} "
+              f"{statistics.mean(v['rougeL'] for v in vs_ref):7.3f}")
+    print("\ndrift = 1 - ROUGE F1 against the fp32 output (0 means identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Legal-term matching cost as the glossary grows: per-term substring scan vs the Aho-Corasick matcher.
+
+    python -m benchmarks.bench_term_matcher --sizes 15,100,1000,5000
+"""
+import argparse
+import glob
+import random
+import string
+import time
+
+from modules.legal_dictionary import LEGAL_TERMS
+from modules.term_matcher import TermMatcher
+
+
+def naive_explain(text, terms):
+    # The previous explain_terms: lowercase the text and substring-search once per term
+    return {term: terms[term] for term in terms if term.lower() in text.lower()}
+
+
+def synthetic_glossary(size, seed=42):
+    rng = random.Random(seed)
+    terms = dict(LEGAL_TERMS)
+    while len(terms) < size:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10)))
+                 for _ in range(rng.randint(1, 3))]
+        terms[" ".join(words)] = "synthetic definition"
+    return terms
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="15,100,1000,5000")
+    parser.add_argument("--fixtures", default="uploads/FIR_*.txt")
+    parser.add_argument("--copies", type=int, default=20, help="concatenate the fixtures this many times")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = "\n".join(open(p, encoding="utf-8").read() for p in sorted(glob.glob(args.fixtures))) * args.copies
+    print(f"text: {len(text)} chars\n")
+    print(f"{'terms':>6} {'build ms':>9} {'automaton ms':>13} {'naive ms':>9} {'speed-up':>9}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        terms = synthetic_glossary(size)
+        start = time.perf_counter()
+        matcher = TermMatcher(terms)
+        build = time.perf_counter() - start
+        fast = timed(lambda: matcher.find(text), args.repeat)
+        naive = timed(lambda: naive_explain(text, terms), args.repeat)
+        print(f"{len(terms):>6} {build * 1000:9.1f} {fast * 1000:13.2f} {naive * 1000:9.2f} {naive / fast:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
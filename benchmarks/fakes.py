@@ -0,0 +1,69 @@
+"""
+Deterministic local stand-ins for the network services and the BART summarizer, with
+optional injected latency, so the pipeline can be measured offline and repeatably.
+Gemini and gTTS use the local backends of modules/gemini_client.py and modules/tts_generator.py.
+
+    from benchmarks import fakes
+    fakes.install(gemini_latency=0.8, translate_latency=0.15, tts_latency=0.3)
+"""
+import os
+import time
+
+from modules import fir_simplifier, gemini_client, legal_summarizer, model_registry, translator, tts_generator
+
+
+def _first_words(text, n):
+    return " ".join(text.split()[:n])
+
+
+class SlowLocalTranslator(translator.LocalBackend):
+    """
+    LocalBackend plus a fixed delay per request, like one googletrans round trip.
+    """
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+
+    def translate_batch(self, sentences, dest):
+        time.sleep(self.latency)
+        return super().translate_batch(sentences, dest)
+
+
+class _FakeTokenizer:
+    # One token per word is close enough for chunking decisions
+    def __call__(self, pieces, add_special_tokens=False):
+        return {"input_ids": [[0] * len(p.split()) for p in pieces]}
+
+
+class FakeSummarizer:
+    """
+    transformers summarization pipeline: keeps the first max_length words of each input.
+    """
+    def __init__(self, latency=0.0):
+        self.tokenizer = _FakeTokenizer()
+        self.latency = latency
+
+    def __call__(self, texts, max_length=150, **kwargs):
+        texts = [texts] if isinstance(texts, str) else texts
+        time.sleep(self.latency)
+        return [{"summary_text": _first_words(t, max_length)} for t in texts]
+
+
+def install(gemini_latency=0.0, translate_latency=0.0, tts_latency=0.0, summarizer_latency=0.0, gemini=True):
+    """
+    Patches the app modules to use the fakes. With gemini=False simplification goes
+    through the (fake) summarizer instead, like a deployment without an API key.
+    """
+    if gemini:
+        gemini_client.set_backend(gemini_client.LocalBackend(gemini_latency))
+    else:
+        gemini_client.set_backend(None)
+        os.environ.pop("GEMINI_API_KEY", None)
+
+    fir_simplifier.HF_AVAILABLE = True
+    legal_summarizer.MODEL_AVAILABLE = True
+    model_registry._models.pop(model_registry.SUMMARIZER, None)
+    model_registry.register_model(model_registry.SUMMARIZER, lambda: FakeSummarizer(summarizer_latency))
+
+    translator.set_backend(SlowLocalTranslator(translate_latency))
+    tts_generator.set_backend(tts_generator.LocalBackend(tts_latency))
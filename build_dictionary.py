@@ -0,0 +1,26 @@
+# build_dictionary.py
+# Compiles the legal glossary and WordNet glosses into database/definitions.bin,
+# the memory-mapped table /define_word and /define_words read from.
+#
+#   python build_dictionary.py                    # every WordNet lemma
+#   python build_dictionary.py --vocab words.txt  # only the words listed (one per line)
+
+import argparse
+import time
+
+import config
+from modules.dictionary_helper import build_definitions
+
+parser = argparse.ArgumentParser(description="Build the compiled definitions table.")
+parser.add_argument("--vocab", help="file with one word per line to include (default: all WordNet lemmas)")
+parser.add_argument("--output", default=config.DEFINITIONS_PATH)
+args = parser.parse_args()
+
+vocabulary = None
+if args.vocab:
+    with open(args.vocab, "r", encoding="utf-8") as f:
+        vocabulary = [line.strip() for line in f if line.strip()]
+
+start = time.perf_counter()
+count = build_definitions(args.output, vocabulary)
+print(f"✅ Wrote {count} definitions to {args.output} in {time.perf_counter() - start:.1f}s")
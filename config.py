@@ -0,0 +1,118 @@
+import os
+
+# ---- Model settings ----
+SUMMARIZER_MODEL = os.getenv("SUMMARIZER_MODEL", "facebook/bart-large-cnn")
+# Inference backend for the summarizer: pytorch (fp32), int8 (dynamic quantization) or onnx
+SUMMARIZER_BACKEND = os.getenv("SUMMARIZER_BACKEND", "pytorch")
+# Where exported ONNX graphs are kept
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "onnx"))
+
+# CPU threads used by torch for inference (0 = torch default)
+TORCH_THREADS = int(os.getenv("TORCH_THREADS", "0"))
+
+# Long documents are summarized in token-bounded, sentence-aligned chunks (map)
+# whose summaries are then summarized again (reduce). BART reads at most 1024 tokens.
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "900"))
+SUMMARY_CHUNK_MAX_LENGTH = int(os.getenv("SUMMARY_CHUNK_MAX_LENGTH", "120"))
+SUMMARY_CHUNK_MIN_LENGTH = int(os.getenv("SUMMARY_CHUNK_MIN_LENGTH", "30"))
+# Chunks summarized together in one forward pass
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+
+# Load heavy models when the app starts instead of on the first request
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "0") == "1"
+
+# ---- Gemini (simplification) ----
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-pro")
+# google (google.generativeai, needs GEMINI_API_KEY) or local (offline stand-in for tests and benchmarks)
+GEMINI_BACKEND = os.getenv("GEMINI_BACKEND", "google")
+# Seconds the local stand-in takes per call
+GEMINI_LOCAL_DELAY = float(os.getenv("GEMINI_LOCAL_DELAY", "0"))
+# Hard timeout of one upstream call, in seconds
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+# Concurrent Gemini calls
+GEMINI_WORKERS = int(os.getenv("GEMINI_WORKERS", "8"))
+# Seconds a request waits for Gemini before falling back to BART / truncation (0 = no limit)
+SIMPLIFY_BUDGET = float(os.getenv("SIMPLIFY_BUDGET", "8"))
+
+# ---- Pipeline settings ----
+# Threads used to run independent stages of one upload concurrently
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+
+# ---- Storage ----
+DATABASE_PATH = os.getenv("DATABASE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "app.sqlite3"))
+
+# ---- Result cache (simplification, summary, translation) ----
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "1") == "1"
+RESULT_CACHE_MEMORY_ITEMS = int(os.getenv("RESULT_CACHE_MEMORY_ITEMS", "512"))
+RESULT_CACHE_MAX_ROWS = int(os.getenv("RESULT_CACHE_MAX_ROWS", "20000"))
+RESULT_CACHE_MAX_AGE = int(os.getenv("RESULT_CACHE_MAX_AGE_DAYS", "30")) * 24 * 3600
+
+# ---- Audio store (TTS output) ----
+AUDIO_DIR = os.getenv("AUDIO_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "audio"))
+AUDIO_STORE_MAX_BYTES = int(os.getenv("AUDIO_STORE_MAX_MB", "200")) * 1024 * 1024
+# Browser cache lifetime for served audio (files are immutable)
+AUDIO_CACHE_MAX_AGE = int(os.getenv("AUDIO_CACHE_MAX_AGE", str(365 * 24 * 3600)))
+
+# ---- Text to speech ----
+# gtts (Google, network) or local (offline stand-in for tests and benchmarks)
+TTS_BACKEND = os.getenv("TTS_BACKEND", "gtts")
+# Split text at sentence boundaries and synthesize the pieces in parallel; the page gets the
+# audio URL as soon as the first piece is written and the rest is streamed as it arrives
+TTS_CHUNKED = os.getenv("TTS_CHUNKED", "1") == "1"
+# Characters per piece (the first piece is a single sentence, so playback starts sooner)
+TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "400"))
+# Pieces synthesized at the same time, across all requests
+TTS_WORKERS = int(os.getenv("TTS_WORKERS", "4"))
+
+# ---- Background jobs (POST /jobs) ----
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Submissions beyond this many waiting jobs get HTTP 429
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "16"))
+# Finished jobs are kept this many seconds for status polling
+JOB_TTL = int(os.getenv("JOB_TTL", "3600"))
+
+# ---- Classification ----
+# Versioned bundle with the vectorizer, both models and metadata (written by train.py);
+# replaced atomically and picked up by running workers without a restart
+CLASSIFIER_BUNDLE_PATH = os.getenv("CLASSIFIER_BUNDLE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "classifier.joblib"))
+# Memory-map the bundle's arrays so forked workers share one copy
+CLASSIFIER_MMAP = os.getenv("CLASSIFIER_MMAP", "1") == "1"
+# NumPy-only export of linear models; when present it is served instead of the bundle,
+# so web workers never import scikit-learn (see modules/fast_classifier.py)
+CLASSIFIER_FAST_PATH = os.getenv("CLASSIFIER_FAST_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "classifier_fast.npz"))
+CLASSIFIER_FAST = os.getenv("CLASSIFIER_FAST", "1") == "1"
+# Rows per sparse-matrix chunk in predict_crime_batch
+CLASSIFY_CHUNK_SIZE = int(os.getenv("CLASSIFY_CHUNK_SIZE", "2000"))
+
+# ---- OCR ----
+# Processes used to extract / OCR PDF pages in parallel
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+# Only the first N pages of a PDF are read (0 = all pages)
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "0"))
+# Image preprocessing before Tesseract (grayscale, downscale, binarize, deskew, crop)
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "1") == "1"
+# Resolution Tesseract is given; higher-DPI scans are scaled down to it
+OCR_TARGET_DPI = int(os.getenv("OCR_TARGET_DPI", "300"))
+# Longest image side after downscaling (A4 at 300 DPI is ~3500 px)
+OCR_MAX_SIDE = int(os.getenv("OCR_MAX_SIDE", "3500"))
+# Uploads up to this size are processed entirely in memory; larger ones spill to a temp file
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(2 * 1024 * 1024)))
+
+# ---- Metrics ----
+# Stage latency histograms and request counters served on /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+# Show the per-stage timing breakdown on the result page for every request
+# (otherwise only when the form / query has timings=1)
+RESULT_TIMINGS = os.getenv("RESULT_TIMINGS", "0") == "1"
+
+# ---- Translation ----
+# google (googletrans) or local (offline stand-in for tests and benchmarks)
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "google")
+# Sentences kept in memory in front of the SQLite translation memory
+TRANSLATION_MEMORY_ITEMS = int(os.getenv("TRANSLATION_MEMORY_ITEMS", "5000"))
+
+# ---- Dictionary ----
+# Compiled legal + WordNet definitions (build with `python build_dictionary.py`)
+DEFINITIONS_PATH = os.getenv("DEFINITIONS_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "database", "definitions.bin"))
+# Translated definitions kept in memory
+DEFINITION_TRANSLATION_ITEMS = int(os.getenv("DEFINITION_TRANSLATION_ITEMS", "2000"))
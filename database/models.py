@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+import time
+
+import config
+
+# One connection per (thread, database file); sqlite3 connections are not shared across threads
+_local = threading.local()
+
+# A cache hit refreshes accessed_at (used for LRU eviction) at most this often, in seconds,
+# so repeated hits are plain reads instead of one WAL write each
+CACHE_TOUCH_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS result_cache (
+    key         TEXT PRIMARY KEY,
+    stage       TEXT NOT NULL,
+    lang        TEXT NOT NULL,
+    value       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_result_cache_accessed ON result_cache (accessed_at);
+CREATE INDEX IF NOT EXISTS idx_result_cache_created ON result_cache (created_at);
+
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_hash TEXT NOT NULL,
+    lang        TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    target      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    PRIMARY KEY (source_hash, lang)
+);
+"""
+
+
+def get_connection(path=None):
+    """
+    Returns this thread's connection to the SQLite database, creating tables on first use.
+    """
+    path = path or config.DATABASE_PATH
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conns[path] = conn
+    return conn
+
+
+# ---- result_cache ----
+def cache_get(key, max_age=None, path=None):
+    """
+    Returns (value, created_at) for a cache key or None. Entries older than max_age seconds are ignored.
+    """
+    conn = get_connection(path)
+    row = conn.execute("SELECT value, created_at, accessed_at FROM result_cache WHERE key = ?",
+                       (key,)).fetchone()
+    if row is None:
+        return None
+    value, created_at, accessed_at = row
+    now = time.time()
+    if max_age is not None and now - created_at > max_age:
+        return None
+    if now - accessed_at > CACHE_TOUCH_INTERVAL:
+        with conn:
+            conn.execute("UPDATE result_cache SET accessed_at = ? WHERE key = ?", (now, key))
+    return value, created_at
+
+
+def cache_put(key, stage, lang, value, path=None):
+    now = time.time()
+    conn = get_connection(path)
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO result_cache (key, stage, lang, value, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (key, stage, lang, value, now, now),
+        )
+
+
+def cache_evict(max_rows, max_age, path=None):
+    """
+    Deletes entries older than max_age seconds, then the least recently used ones above max_rows.
+    Returns the number of deleted rows.
+    """
+    conn = get_connection(path)
+    with conn:
+        deleted = conn.execute("DELETE FROM result_cache WHERE created_at < ?",
+                               (time.time() - max_age,)).rowcount
+        deleted += conn.execute(
+            "DELETE FROM result_cache WHERE key IN ("
+            "SELECT key FROM result_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (max_rows,),
+        ).rowcount
+    return deleted
+
+
+def cache_count(path=None):
+    return get_connection(path).execute("SELECT COUNT(*) FROM result_cache").fetchone()[0]
+
+
+# ---- translation_memory ----
+def tm_get_many(hashes, lang, path=None):
+    """
+    Returns {source_hash: target} for the hashes present in the translation memory.
+    """
+    if not hashes:
+        return {}
+    conn = get_connection(path)
+    found = {}
+    hashes = list(hashes)
+    # Stay under SQLite's bound-parameter limit
+    for i in range(0, len(hashes), 500):
+        part = hashes[i:i + 500]
+        rows = conn.execute(
+            f"SELECT source_hash, target FROM translation_memory "
+            f"WHERE lang = ? AND source_hash IN ({','.join('?' * len(part))})",
+            [lang, *part],
+        ).fetchall()
+        found.update(rows)
+    return found
+
+
+def tm_put_many(entries, lang, path=None):
+    """
+    entries: iterable of (source_hash, source, target).
+    """
+    now = time.time()
+    conn = get_connection(path)
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO translation_memory (source_hash, lang, source, target, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(h, lang, src, tgt, now) for h, src, tgt in entries],
+        )
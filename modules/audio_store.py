@@ -0,0 +1,349 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+
+import config
+
+# Per-key locks so two requests for the same audio synthesize it only once
+_key_locks = {}
+_key_locks_guard = threading.Lock()
+_quota_lock = threading.Lock()
+
+# .part / .tmp files not touched for this many seconds are left over from a crash
+_STALE_SECONDS = 3600
+
+
+def audio_filename(text, lang="en"):
+    """
+    Content-addressed file name for (text, lang): identical requests share one file.
+    """
+    digest = hashlib.sha256(f"{lang}\0{text.strip()}".encode("utf-8")).hexdigest()
+    return f"fir_{lang}_{digest[:32]}.mp3"
+
+
+def audio_path(filename):
+    return os.path.join(config.AUDIO_DIR, filename)
+
+
+def _lock_for(key):
+    with _key_locks_guard:
+        lock = _key_locks.get(key)
+        if lock is None:
+            lock = _key_locks[key] = threading.Lock()
+        return lock
+
+
+def _touch(path):
+    # mtime doubles as "last used" for LRU eviction
+    try:
+        os.utime(path, None)
+        return True
+    except OSError:
+        return False
+
+
+def get_or_create(text, lang, synthesize):
+    """
+    Returns the file name of the audio for (text, lang), calling synthesize(text, lang, path)
+    only if it is not stored yet. The file is written to a temp name and renamed into place,
+    so readers never see a partial file.
+    """
+    filename = audio_filename(text, lang)
+    path = audio_path(filename)
+    if _touch(path):
+        return filename
+
+    with _lock_for(filename):
+        if _touch(path):
+            return filename
+        os.makedirs(config.AUDIO_DIR, exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            synthesize(text, lang, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    with _key_locks_guard:
+        _key_locks.pop(filename, None)
+
+    enforce_quota(keep=filename)
+    return filename
+
+
+# ---- Chunked synthesis, readable while it is still being written ----
+class _Partial:
+    """
+    An audio file being assembled from pieces in <name>.part. size only grows; readers wait on cond.
+    The finished file is renamed into place as soon as the last piece is written; open readers keep
+    reading the same file under its new name. Where the rename fails because a reader still has the
+    file open (Windows), the last reader to close it renames it instead.
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.part_path = f"{audio_path(filename)}.part"
+        self.size = 0
+        self.done = False
+        self.error = None
+        self.readers = 0
+        self.settled = False  # renamed into place (or removed after an error); set once
+        self.cond = threading.Condition()
+
+    def wait_for(self, offset, timeout=None):
+        """
+        Blocks until more than `offset` bytes are written or the file is finished.
+        Returns (size, done).
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.size > offset or self.done, timeout)
+            return self.size, self.done
+
+    def open_reader(self):
+        """
+        Opens the .part file for reading; close_reader() must follow.
+        Raises FileNotFoundError once the file has been renamed into place.
+        """
+        with self.cond:
+            if self.settled:
+                raise FileNotFoundError(self.part_path)
+            f = open(self.part_path, "rb")
+            self.readers += 1
+            return f
+
+    def close_reader(self, f):
+        f.close()
+        with self.cond:
+            self.readers -= 1
+            if self.readers == 0 and self.done:
+                self._settle()
+
+    def _settle(self):
+        # Called with cond held once assembly is over, and again by the last reader to close
+        if self.settled:
+            return
+        if self.error is None:
+            try:
+                os.replace(self.part_path, audio_path(self.filename))
+            except PermissionError:
+                if self.readers:
+                    # Windows: the file is open; close_reader() retries when the last reader is done
+                    return
+                raise
+            except OSError as e:
+                print(f"[ERROR] Could not store chunked audio {self.filename}: {e}")
+                self.error = e
+        self.settled = True
+        if self.error is not None:
+            try:
+                os.remove(self.part_path)
+            except OSError:
+                pass
+        _partials.pop(self.filename, None)
+        with _key_locks_guard:
+            _key_locks.pop(self.filename, None)
+        self.cond.notify_all()
+
+
+_partials = {}  # file name -> _Partial
+
+
+def partial(filename):
+    """
+    The _Partial for a file still being written, or None.
+    """
+    return _partials.get(filename)
+
+
+def wait_pending(timeout=None):
+    """
+    Waits for all chunked syntheses in progress to be stored (benchmarks, shutdown).
+    """
+    for state in list(_partials.values()):
+        with state.cond:
+            state.cond.wait_for(lambda: state.settled, timeout)
+
+
+def get_or_create_chunked(text, lang, chunks, synthesize_chunk, pool):
+    """
+    Like get_or_create(), but synthesize_chunk(chunk, lang) -> MP3 frames runs for every chunk
+    on `pool`, and the frames are appended to <name>.part in chunk order as they complete.
+    Returns the file name as soon as the first chunk is written; the finished file is renamed
+    into place afterwards. Until then partial(filename) lets readers follow the growing file.
+    """
+    filename = audio_filename(text, lang)
+    path = audio_path(filename)
+    if _touch(path):
+        return filename
+
+    with _lock_for(filename):
+        if _touch(path):
+            return filename
+        state = _partials.get(filename)
+        if state is None:
+            os.makedirs(config.AUDIO_DIR, exist_ok=True)
+            state = _Partial(filename)
+            open(state.part_path, "wb").close()
+            futures = [pool.submit(synthesize_chunk, chunk, lang) for chunk in chunks]
+            _partials[filename] = state
+            threading.Thread(target=_assemble, args=(state, futures), daemon=True,
+                             name=f"audio-{filename[:16]}").start()
+
+    size, _ = state.wait_for(0)
+    if state.error is not None and size == 0:
+        raise state.error
+    return filename
+
+
+def _assemble(state, futures):
+    # Appends each chunk in order as soon as it and all earlier ones are done
+    try:
+        with open(state.part_path, "ab") as out:
+            for future in futures:
+                data = future.result()
+                out.write(data)
+                out.flush()
+                with state.cond:
+                    state.size += len(data)
+                    state.cond.notify_all()
+    except Exception as e:
+        print(f"[ERROR] Chunked audio {state.filename} failed: {e}")
+        for future in futures:
+            future.cancel()
+        state.error = e
+    finally:
+        with state.cond:
+            state.done = True
+            state.cond.notify_all()
+            state._settle()
+    if state.error is None:
+        enforce_quota(keep=state.filename)
+
+
+class _Follower:
+    """
+    Iterator over a file being assembled, from `start` on, following it until it is finished
+    (or nothing new arrives for stall_timeout seconds). close() releases the .part file.
+    """
+    def __init__(self, state, start, stall_timeout):
+        self.state = state
+        self.pos = start
+        self.stall_timeout = stall_timeout
+        self.f = state.open_reader()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.f is not None:
+            size, _ = self.state.wait_for(self.pos, timeout=self.stall_timeout)
+            if size > self.pos:
+                self.f.seek(self.pos)
+                data = self.f.read(size - self.pos)
+                self.pos += len(data)
+                return data
+        self.close()
+        raise StopIteration
+
+    def close(self):
+        if self.f is not None:
+            f, self.f = self.f, None
+            self.state.close_reader(f)
+
+
+def iter_partial(state, start=0, stall_timeout=60):
+    """
+    Bytes of a file being assembled from `start` on, following it until it is finished.
+    The returned iterator must be closed (WSGI servers do) so the file can be renamed into place.
+    Raises FileNotFoundError if the file was finished (renamed) before it could be opened.
+    """
+    return _Follower(state, start, stall_timeout)
+
+
+def read_partial(state, start, end=None):
+    """
+    The bytes written so far in [start, end) of a file being assembled, waiting until there is at
+    least one. Returns b"" when the file ended before `start`.
+    Raises FileNotFoundError if the file was finished (renamed) in the meantime.
+    """
+    size, _ = state.wait_for(start, timeout=60)
+    stop = size if end is None else min(size, end)
+    if stop <= start:
+        return b""
+    f = state.open_reader()
+    try:
+        f.seek(start)
+        return f.read(stop - start)
+    finally:
+        state.close_reader(f)
+
+
+def enforce_quota(max_bytes=None, keep=None):
+    """
+    Deletes .part / .tmp files left over from a crash, then least recently used audio files until
+    the store fits in max_bytes. Files still being written count toward the total.
+    Returns the number of files removed.
+    """
+    max_bytes = config.AUDIO_STORE_MAX_BYTES if max_bytes is None else max_bytes
+    with _quota_lock:
+        entries = []
+        total = 0
+        try:
+            names = os.listdir(config.AUDIO_DIR)
+        except FileNotFoundError:
+            return 0
+        in_progress = {f"{name}.part" for name in list(_partials)}
+        now = time.time()
+        removed = 0
+        for name in names:
+            if not name.endswith((".mp3", ".part", ".tmp")):
+                continue
+            try:
+                st = os.stat(audio_path(name))
+            except OSError:
+                continue
+            if name.endswith(".mp3"):
+                entries.append((st.st_mtime, st.st_size, name))
+            elif name not in in_progress and now - st.st_mtime > _STALE_SECONDS:
+                # Writes in progress keep their mtime fresh; an old one was abandoned by a crash
+                try:
+                    os.remove(audio_path(name))
+                    removed += 1
+                    continue
+                except OSError:
+                    pass
+            total += st.st_size
+
+        for _, size, name in sorted(entries):
+            if total <= max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(audio_path(name))
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            print(f"[INFO] Audio store evicted {removed} file(s)")
+        return removed
+
+
+def usage():
+    """
+    Number of stored files and the size in bytes of the store, including files being written.
+    """
+    files = 0
+    total = 0
+    if os.path.isdir(config.AUDIO_DIR):
+        for name in os.listdir(config.AUDIO_DIR):
+            if not name.endswith((".mp3", ".part", ".tmp")):
+                continue
+            files += name.endswith(".mp3")
+            try:
+                total += os.path.getsize(audio_path(name))
+            except OSError:
+                pass
+    return {"files": files, "bytes": total, "max_bytes": config.AUDIO_STORE_MAX_BYTES}
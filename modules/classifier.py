@@ -1,12 +1,172 @@
+import os
+import threading
+
 import joblib
 
-# Load models
-vectorizer = joblib.load("models/tfidf_vectorizer.pkl")
-crime_type_model = joblib.load("models/crime_type_model.pkl")
-severity_model = joblib.load("models/severity_model.pkl")
+import config
+from modules import model_bundle
+from modules.fast_classifier import FastClassifier
+
+# Loose pickles from before the bundle existed; used only when no bundle is present
+LEGACY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+LEGACY_FILES = ("tfidf_vectorizer.pkl", "crime_type_model.pkl", "severity_model.pkl")
+
+
+class ClassifierUnavailable(RuntimeError):
+    """No trained classifier to serve (train one with `python train.py`)."""
+
+
+# Swapped as a whole on reload so a request never mixes two bundles
+_state = {"signature": None, "bundle": None}
+_fast_state = {"signature": None, "model": None}
+_lock = threading.Lock()
+
+
+def _load_legacy():
+    paths = [os.path.join(LEGACY_DIR, name) for name in LEGACY_FILES]
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    vectorizer, crime_type_model, severity_model = (joblib.load(p) for p in paths)
+    return {
+        "metadata": {"version": "legacy", "feature_hash": model_bundle.feature_hash(vectorizer)},
+        "vectorizer": vectorizer,
+        "crime_type_model": crime_type_model,
+        "severity_model": severity_model,
+    }
+
+
+def _get_bundle():
+    """
+    The current bundle, reloaded when the bundle file is replaced. A bundle that fails
+    to load keeps the previous one serving.
+    """
+    path = config.CLASSIFIER_BUNDLE_PATH
+    signature = model_bundle.file_signature(path)
+    if signature != _state["signature"] or _state["bundle"] is None:
+        with _lock:
+            if signature != _state["signature"] or _state["bundle"] is None:
+                bundle = _state["bundle"]
+                try:
+                    if signature is not None:
+                        bundle = model_bundle.load_bundle(path, mmap=config.CLASSIFIER_MMAP)
+                        print(f"[INFO] Loaded classifier bundle {bundle['metadata'].get('version')}")
+                    elif bundle is None:
+                        bundle = _load_legacy()
+                except Exception as e:
+                    print("⚠️ Could not load classifier bundle, keeping the previous one:", e)
+                _state["bundle"], _state["signature"] = bundle, signature
+    if _state["bundle"] is None:
+        raise ClassifierUnavailable("no classifier bundle at " + path)
+    return _state["bundle"]
+
+
+def _get_fast():
+    """
+    The NumPy fast-path classifier, or None when it is disabled or not exported.
+    Reloaded like the bundle when its file is replaced.
+    """
+    if not config.CLASSIFIER_FAST:
+        return None
+    path = config.CLASSIFIER_FAST_PATH
+    signature = model_bundle.file_signature(path)
+    if signature != _fast_state["signature"]:
+        with _lock:
+            if signature != _fast_state["signature"]:
+                model = None
+                try:
+                    if signature is not None:
+                        model = FastClassifier(path)
+                        print(f"[INFO] Loaded fast classifier {model.version}")
+                except Exception as e:
+                    print("⚠️ Could not load fast classifier, using the bundle:", e)
+                _fast_state["model"], _fast_state["signature"] = model, signature
+    return _fast_state["model"]
+
+
+def classifier_info():
+    """
+    Metadata of the bundle being served, or None when there is none.
+    """
+    fast = _get_fast()
+    if fast is not None:
+        return {"version": fast.version, "fast_path": True}
+    try:
+        return dict(_get_bundle()["metadata"])
+    except ClassifierUnavailable:
+        return None
+
 
 def predict_crime(fir_text):
-    X_new = vectorizer.transform([fir_text])
-    crime_type = crime_type_model.predict(X_new)[0]
-    severity = severity_model.predict(X_new)[0]
-    return crime_type, severity
\ No newline at end of file
+    fast = _get_fast()
+    if fast is not None:
+        return fast.predict([fir_text])[0]
+    bundle = _get_bundle()
+    X_new = bundle["vectorizer"].transform([fir_text])
+    crime_type = bundle["crime_type_model"].predict(X_new)[0]
+    severity = bundle["severity_model"].predict(X_new)[0]
+    return crime_type, severity
+
+
+def _predict_with_proba(model, X):
+    """
+    Labels and per-class probabilities from a single predict_proba call
+    (predict() would compute the same probabilities again).
+    """
+    if not hasattr(model, "predict_proba"):
+        return model.predict(X), None
+    proba = model.predict_proba(X)
+    return model.classes_[proba.argmax(axis=1)], proba
+
+
+def _result(crime_type, severity, type_classes, type_proba, severity_classes, severity_proba):
+    return {
+        "crime_type": str(crime_type),
+        "severity": str(severity),
+        "crime_type_probabilities": (
+            dict(zip(type_classes, type_proba.round(4).tolist())) if type_proba is not None else None
+        ),
+        "severity_probabilities": (
+            dict(zip(severity_classes, severity_proba.round(4).tolist())) if severity_proba is not None else None
+        ),
+    }
+
+
+def predict_crime_batch(texts, chunk_size=None):
+    """
+    Classifies many FIR texts at once. The texts are vectorized in one call and
+    both models run on the sparse matrix chunk by chunk.
+    Returns one dict per text: crime_type, severity and the class probabilities of each model.
+    """
+    chunk_size = chunk_size or config.CLASSIFY_CHUNK_SIZE
+    texts = ["" if t is None else str(t) for t in texts]
+    if not texts:
+        return []
+
+    fast = _get_fast()
+    if fast is not None:
+        results = []
+        for start in range(0, len(texts), chunk_size):
+            types, type_proba, severities, severity_proba = fast.predict_proba(texts[start:start + chunk_size])
+            for i in range(len(types)):
+                results.append(_result(types[i], severities[i], fast.type_classes, type_proba[i],
+                                       fast.severity_classes, severity_proba[i]))
+        return results
+
+    bundle = _get_bundle()
+    crime_type_model, severity_model = bundle["crime_type_model"], bundle["severity_model"]
+    X = bundle["vectorizer"].transform(texts)
+    type_classes = [str(c) for c in getattr(crime_type_model, "classes_", [])]
+    severity_classes = [str(c) for c in getattr(severity_model, "classes_", [])]
+
+    results = []
+    for start in range(0, X.shape[0], chunk_size):
+        X_chunk = X[start:start + chunk_size]
+        types, type_proba = _predict_with_proba(crime_type_model, X_chunk)
+        severities, severity_proba = _predict_with_proba(severity_model, X_chunk)
+        for i in range(X_chunk.shape[0]):
+            results.append(_result(
+                types[i], severities[i],
+                type_classes, type_proba[i] if type_proba is not None else None,
+                severity_classes, severity_proba[i] if severity_proba is not None else None,
+            ))
+    return results
@@ -0,0 +1,117 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import weakref
+
+# File layout (little endian):
+#   b"DEF1" | uint32 count
+#   count x (uint32 key_offset, uint32 key_length, uint32 value_offset, uint32 value_length), sorted by key bytes
+#   UTF-8 blob holding every key and value
+_MAGIC = b"DEF1"
+_HEADER = struct.Struct("<4sI")
+_ENTRY = struct.Struct("<IIII")
+
+
+def write_table(path, entries):
+    """
+    Writes {key: definition} to path. Keys should already be normalized (see normalize_key).
+    The table is written to a unique temporary file next to path and renamed over it, so
+    concurrent builds don't write into each other's file and readers never see a partial one.
+    """
+    items = sorted((k.encode("utf-8"), v.encode("utf-8")) for k, v in entries.items())
+    index = bytearray()
+    blob = bytearray()
+    for key, value in items:
+        key_off = len(blob)
+        blob += key
+        value_off = len(blob)
+        blob += value
+        index += _ENTRY.pack(key_off, len(key), value_off, len(value))
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, len(items)))
+            f.write(index)
+            f.write(blob)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return len(items)
+
+
+def normalize_key(word):
+    return " ".join(word.replace("_", " ").lower().split())
+
+
+class DefinitionTable:
+    """
+    Read-only, memory-mapped lookup over a table written by write_table().
+    Pages are shared between processes and only touched on lookup.
+    The mapping is closed by close() or, at the latest, when the table is garbage collected.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._finalizer = weakref.finalize(self, self._mm.close)
+        magic, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{path} is not a definition table")
+        self._index_start = _HEADER.size
+        self._blob_start = self._index_start + self.count * _ENTRY.size
+
+    def _entry(self, i):
+        return _ENTRY.unpack_from(self._mm, self._index_start + i * _ENTRY.size)
+
+    def _key(self, entry):
+        start = self._blob_start + entry[0]
+        return self._mm[start:start + entry[1]]
+
+    def get(self, word):
+        key = normalize_key(word).encode("utf-8")
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            probe = self._key(entry)
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                start = self._blob_start + entry[2]
+                return self._mm[start:start + entry[3]].decode("utf-8")
+        return None
+
+    def close(self):
+        self._finalizer()
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+
+def open_table(path):
+    """
+    Shared table for path, reopened when the file is rebuilt. Returns None if it doesn't exist.
+    """
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _tables.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with _tables_lock:
+        cached = _tables.get(path)
+        if cached is None or cached[0] != mtime:
+            # The replaced table stays usable by readers still holding it (os.replace swapped the
+            # inode) and its mapping is closed when the last of them lets go of it
+            _tables[path] = (mtime, DefinitionTable(path))
+        return _tables[path][1]
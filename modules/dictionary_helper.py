@@ -1,16 +1,150 @@
-import nltk
-from nltk.corpus import wordnet
+import threading
+from collections import OrderedDict
 
-# Check and download required data only if missing
-try:
-    nltk.data.find('corpora/wordnet')
-    nltk.data.find('corpora/omw-1.4')
-except LookupError:
-    nltk.download('wordnet', quiet=True)
-    nltk.download('omw-1.4', quiet=True)
+import config
+from modules import legal_dictionary
+from modules.definition_table import open_table, write_table, normalize_key
 
-def get_word_meaning(word):
-    synsets = wordnet.synsets(word)
+NOT_FOUND = "Meaning not found."
+
+# WordNet is only imported when there is no compiled table (or while building one):
+# loading the corpus takes seconds.
+_wordnet = None
+_wordnet_lock = threading.Lock()
+
+# Suffix rules tried when a word form isn't in the table (a small subset of WordNet's morphy)
+_SUFFIXES = [
+    ("ies", "y"), ("ses", "s"), ("xes", "x"), ("zes", "z"), ("ches", "ch"), ("shes", "sh"),
+    ("men", "man"), ("es", "e"), ("es", ""), ("s", ""),
+    ("ing", "e"), ("ing", ""), ("ed", "e"), ("ed", ""), ("est", "e"), ("est", ""), ("er", "e"), ("er", ""),
+]
+
+
+def _get_wordnet():
+    global _wordnet
+    if _wordnet is None:
+        with _wordnet_lock:
+            if _wordnet is None:
+                import nltk
+                # Check and download required data only if missing
+                try:
+                    nltk.data.find('corpora/wordnet')
+                    nltk.data.find('corpora/omw-1.4')
+                except LookupError:
+                    nltk.download('wordnet', quiet=True)
+                    nltk.download('omw-1.4', quiet=True)
+                from nltk.corpus import wordnet
+                _wordnet = wordnet
+    return _wordnet
+
+
+def _wordnet_meaning(word):
+    synsets = _get_wordnet().synsets(word)
     if synsets:
         return synsets[0].definition()
-    return "Meaning not found."
\ No newline at end of file
+    return None
+
+
+def _table_meaning(table, word):
+    meaning = table.get(word)
+    if meaning is not None:
+        return meaning
+    key = normalize_key(word)
+    for suffix, replacement in _SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix) + 1:
+            meaning = table.get(key[:-len(suffix)] + replacement)
+            if meaning is not None:
+                return meaning
+    return None
+
+
+def get_word_meaning(word):
+    table = open_table(config.DEFINITIONS_PATH)
+    if table is not None:
+        meaning = _table_meaning(table, word)
+    else:
+        legal = {normalize_key(k): v for k, v in legal_dictionary.LEGAL_TERMS.items()}
+        meaning = legal.get(normalize_key(word)) or _wordnet_meaning(word)
+    return meaning or NOT_FOUND
+
+
+def get_word_meanings(words):
+    """
+    Meanings for many words at once: {word: meaning}.
+    """
+    return {word: get_word_meaning(word) for word in words}
+
+
+# ---- Translated definitions ----
+_translations = OrderedDict()
+_translations_lock = threading.Lock()
+
+
+def translate_meanings(meanings, lang):
+    """
+    Translates {word: meaning} into lang. Recently translated definitions come from an LRU;
+    the rest go to the translator in a single call. Untranslatable meanings are kept in English.
+    """
+    if lang == "en":
+        return dict(meanings)
+    from modules.translator import translate_many
+
+    result = {}
+    missing = []
+    with _translations_lock:
+        for word, meaning in meanings.items():
+            if meaning == NOT_FOUND:
+                result[word] = meaning
+                continue
+            cached = _translations.get((meaning, lang))
+            if cached is not None:
+                _translations.move_to_end((meaning, lang))
+                result[word] = cached
+            else:
+                missing.append(word)
+
+    if missing:
+        sources = list(dict.fromkeys(meanings[w] for w in missing))
+        try:
+            translated = dict(zip(sources, translate_many(sources, lang)))
+        except Exception as e:
+            print("⚠️ meaning translation error:", e)
+            translated = {}
+        with _translations_lock:
+            for source, target in translated.items():
+                _translations[(source, lang)] = target
+            while len(_translations) > config.DEFINITION_TRANSLATION_ITEMS:
+                _translations.popitem(last=False)
+        for word in missing:
+            result[word] = translated.get(meanings[word], meanings[word])
+    return result
+
+
+# ---- Build step ----
+def build_definitions(path=None, vocabulary=None):
+    """
+    Compiles LEGAL_TERMS and WordNet glosses into the memory-mapped table at path.
+    Every WordNet lemma (and irregular form) is included unless a vocabulary is given.
+    Legal terms take precedence over WordNet.
+    """
+    path = path or config.DEFINITIONS_PATH
+    wordnet = _get_wordnet()
+    entries = {}
+
+    if vocabulary is None:
+        lemmas = set(wordnet.all_lemma_names())
+        # Irregular forms ("stolen" -> "steal") that the suffix rules can't undo
+        for exceptions in wordnet._exception_map.values():
+            lemmas.update(exceptions)
+    else:
+        lemmas = set(vocabulary)
+
+    for lemma in lemmas:
+        meaning = _wordnet_meaning(lemma)
+        if meaning:
+            entries[normalize_key(lemma)] = meaning
+
+    for term, definition in legal_dictionary.LEGAL_TERMS.items():
+        entries[normalize_key(term)] = definition
+
+    return write_table(path, entries)
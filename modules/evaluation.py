@@ -1,36 +1,114 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import textstat
+import numpy as np
+import re
+from collections import Counter
 
-def evaluate_simplification(original, simplified):
-    # 1️⃣ Cosine similarity
+try:
+    import textstat
+    TEXTSTAT_AVAILABLE = True
+except ImportError:
+    TEXTSTAT_AVAILABLE = False
+
+# Crime keywords whose retention is scored; matched as substrings, case-insensitively
+KEYWORDS = ["complainant", "police", "fir", "investigation", "stolen",
+            "value", "items", "suspect", "crime", "mobile", "laptop"]
+# One pass over the text finds every keyword; the lookahead also catches overlapping ones
+_KEYWORD_PATTERN = re.compile("(?=(" + "|".join(re.escape(k) for k in KEYWORDS) + "))", re.IGNORECASE)
+
+
+def _keywords_in(text):
+    return {m.group(1).lower() for m in _KEYWORD_PATTERN.finditer(text)}
+
+
+def _readability(text):
+    return round(textstat.flesch_reading_ease(text), 2) if TEXTSTAT_AVAILABLE else None
+
+
+def evaluate_corpus(originals, simplified):
+    """
+    Scores many (original, simplified) pairs at once: one TF-IDF vectorizer fitted on the
+    whole corpus, row-wise cosine over the normalized matrices and a precompiled keyword scan.
+    Returns one metrics dict per pair (same fields as evaluate_simplification).
+    """
+    n = len(originals)
+    if n == 0:
+        return []
+
+    # 1️⃣ Cosine similarity: TF-IDF rows are L2-normalized, so cosine is the row-wise dot product
     vectorizer = TfidfVectorizer(stop_words="english")
-    vectors = vectorizer.fit_transform([original, simplified])
-    cos_sim = cosine_similarity(vectors)[0][1]
+    try:
+        vectors = vectorizer.fit_transform(list(originals) + list(simplified))
+        cos_sim = np.asarray(vectors[:n].multiply(vectors[n:]).sum(axis=1)).ravel()
+    except ValueError:
+        # Empty vocabulary (only stop words / empty texts)
+        cos_sim = np.zeros(n)
 
     # 2️⃣ Crime keyword retention
-    keywords = ["complainant", "police", "fir", "investigation", "stolen",
-                "value", "items", "suspect", "crime", "mobile", "laptop"]
-
-    original_cnt = sum(1 for k in keywords if k.lower() in original.lower())
-    simplified_cnt = sum(1 for k in keywords if k.lower() in simplified.lower())
-    keyword_retention = simplified_cnt / original_cnt if original_cnt != 0 else 0
+    original_cnt = np.array([len(_keywords_in(t)) for t in originals], dtype=float)
+    simplified_cnt = np.array([len(_keywords_in(t)) for t in simplified], dtype=float)
+    keyword_retention = np.divide(simplified_cnt, original_cnt, out=np.zeros(n), where=original_cnt != 0)
 
     # 3️⃣ Compression ratio
-    compression_ratio = len(simplified) / len(original)
-
-    # 4️⃣ Readability improvement
-    orig_read = textstat.flesch_reading_ease(original)
-    simp_read = textstat.flesch_reading_ease(simplified)
+    original_len = np.array([len(t) for t in originals], dtype=float)
+    simplified_len = np.array([len(t) for t in simplified], dtype=float)
+    compression_ratio = np.divide(simplified_len, original_len, out=np.zeros(n), where=original_len != 0)
 
     # 5️⃣ Final accuracy score
     accuracy = (cos_sim * 0.4) + (keyword_retention * 0.4) + ((1 - compression_ratio) * 0.2)
 
-    return {
-        "cosine_similarity": round(cos_sim, 3),
-        "keyword_retention": round(keyword_retention, 3),
-        "compression_ratio": round(compression_ratio, 3),
-        "readability_original": round(orig_read, 2),
-        "readability_simplified": round(simp_read, 2),
-        "accuracy_score": round(accuracy * 100, 2)
-    }
+    results = []
+    for i in range(n):
+        # 4️⃣ Readability (textstat is optional)
+        results.append({
+            "cosine_similarity": round(float(cos_sim[i]), 3),
+            "keyword_retention": round(float(keyword_retention[i]), 3),
+            "compression_ratio": round(float(compression_ratio[i]), 3),
+            "readability_original": _readability(originals[i]),
+            "readability_simplified": _readability(simplified[i]),
+            "accuracy_score": round(float(accuracy[i]) * 100, 2)
+        })
+    return results
+
+
+def evaluate_simplification(original, simplified):
+    """
+    Scores one pair; the vectorizer is fitted on just these two texts.
+    """
+    return evaluate_corpus([original], [simplified])[0]
+
+
+def _rouge_tokens(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def _f1(overlap, ref_total, cand_total):
+    if overlap == 0 or ref_total == 0 or cand_total == 0:
+        return 0.0
+    precision = overlap / cand_total
+    recall = overlap / ref_total
+    return 2 * precision * recall / (precision + recall)
+
+
+def _lcs_length(a, b):
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b):
+            cur.append(prev[j] + 1 if x == y else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+def rouge_scores(reference, candidate):
+    """
+    ROUGE-1, ROUGE-2 and ROUGE-L F1 between two texts (lowercased word tokens).
+    """
+    ref, cand = _rouge_tokens(reference), _rouge_tokens(candidate)
+    scores = {}
+    for n in (1, 2):
+        ref_ngrams = Counter(tuple(ref[i:i + n]) for i in range(len(ref) - n + 1))
+        cand_ngrams = Counter(tuple(cand[i:i + n]) for i in range(len(cand) - n + 1))
+        overlap = sum((ref_ngrams & cand_ngrams).values())
+        scores[f"rouge{n}"] = round(_f1(overlap, sum(ref_ngrams.values()), sum(cand_ngrams.values())), 4)
+    scores["rougeL"] = round(_f1(_lcs_length(ref, cand), len(ref), len(cand)), 4)
+    return scores
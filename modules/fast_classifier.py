@@ -0,0 +1,222 @@
+"""
+Serving-only copy of the TF-IDF + linear classifier in plain NumPy arrays.
+
+The export turns the fitted vectorizer and both linear heads into one .npz file
+(vocabulary, idf vector, stacked weight matrix). FastClassifier loads it without
+importing scikit-learn or scipy and reproduces the sklearn labels and probabilities.
+
+    python -m modules.fast_classifier      # export the current bundle
+"""
+import math
+import os
+import re
+import tempfile
+from collections import Counter
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+_NON_LETTERS = re.compile(r"[^a-z\s]")
+
+
+class NotExportable(ValueError):
+    """The model cannot be expressed as TF-IDF features + linear heads."""
+
+
+def letters_only(text):
+    """
+    TfidfVectorizer preprocessor used by train.py (crime_classifier.py's cleaning):
+    lowercase, then drop digits and punctuation. Defined here so the fast path can apply it too.
+    """
+    return _NON_LETTERS.sub("", text.lower())
+
+
+def _head_arrays(model):
+    coef = getattr(model, "coef_", None)
+    if coef is None:
+        raise NotExportable(f"{type(model).__name__} is not a linear model")
+    classes = np.asarray([str(c) for c in model.classes_])
+    # LogisticRegression with >2 classes is multinomial (softmax) unless it was trained
+    # one-vs-rest; SGDClassifier is always one-vs-rest with normalized sigmoids
+    ovr = type(model).__name__ != "LogisticRegression" or getattr(model, "multi_class", "auto") == "ovr" \
+        or getattr(model, "solver", "") == "liblinear"
+    return np.asarray(coef, dtype=np.float64), np.asarray(model.intercept_, dtype=np.float64), classes, ovr
+
+
+def export(vectorizer, crime_type_model, severity_model, path, version=""):
+    """
+    Writes the fast-path arrays. Raises NotExportable for anything but a word-level
+    TfidfVectorizer with linear heads (RandomForest and hashing features have no such form).
+    The only custom preprocessor supported is letters_only.
+    """
+    if not hasattr(vectorizer, "vocabulary_") or getattr(vectorizer, "analyzer", None) != "word" \
+            or vectorizer.preprocessor not in (None, letters_only) or vectorizer.tokenizer is not None:
+        raise NotExportable(f"{type(vectorizer).__name__} is not a plain word TF-IDF vectorizer")
+    if getattr(vectorizer, "strip_accents", None) or getattr(vectorizer, "binary", False):
+        raise NotExportable("strip_accents / binary vectorizers are not supported")
+
+    n_features = len(vectorizer.vocabulary_)
+    terms = np.empty(n_features, dtype=object)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    idf = np.asarray(vectorizer.idf_, dtype=np.float64) if vectorizer.use_idf else np.ones(n_features)
+
+    type_w, type_b, type_classes, type_ovr = _head_arrays(crime_type_model)
+    sev_w, sev_b, sev_classes, sev_ovr = _head_arrays(severity_model)
+    # Both heads in one (n_features, n_rows) matrix: one sparse dot product scores everything
+    weights = np.vstack([type_w, sev_w]).T.copy()
+
+    arrays = {
+        "format_version": np.asarray(FORMAT_VERSION),
+        "version": np.asarray(version),
+        "terms": terms.astype(str),
+        "idf": idf,
+        "weights": weights,
+        "intercepts": np.concatenate([type_b, sev_b]),
+        "type_rows": np.asarray(type_w.shape[0]),
+        "type_classes": type_classes,
+        "severity_classes": sev_classes,
+        "ovr": np.asarray([type_ovr, sev_ovr]),
+        "token_pattern": np.asarray(vectorizer.token_pattern),
+        "lowercase": np.asarray(bool(vectorizer.lowercase)),
+        "letters_only": np.asarray(vectorizer.preprocessor is letters_only),
+        "ngram_range": np.asarray(vectorizer.ngram_range),
+        "stop_words": np.asarray(sorted(vectorizer.get_stop_words() or []), dtype=str),
+        "sublinear_tf": np.asarray(bool(vectorizer.sublinear_tf)),
+        "norm": np.asarray(vectorizer.norm or ""),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+    os.close(fd)
+    try:
+        np.savez(tmp_path, **arrays)
+        # Not mkstemp's private 0600: web workers may run as a different user than train.py
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _head_proba(scores, ovr):
+    if scores.shape[1] == 1:
+        p = _sigmoid(scores[:, 0])
+        return np.column_stack([1.0 - p, p])
+    if ovr:
+        p = _sigmoid(scores)
+        return p / p.sum(axis=1, keepdims=True)
+    e = np.exp(scores - scores.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+
+class FastClassifier:
+    def __init__(self, path):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["format_version"]) != FORMAT_VERSION:
+                raise ValueError(f"unsupported fast classifier format in {path}")
+            self.version = str(data["version"])
+            self.vocabulary = {term: i for i, term in enumerate(data["terms"].tolist())}
+            self.idf = data["idf"]
+            self.weights = data["weights"]
+            self.intercepts = data["intercepts"]
+            self.type_rows = int(data["type_rows"])
+            self.type_classes = data["type_classes"].tolist()
+            self.severity_classes = data["severity_classes"].tolist()
+            self.type_ovr, self.severity_ovr = (bool(x) for x in data["ovr"])
+            self.token_pattern = re.compile(str(data["token_pattern"]))
+            self.lowercase = bool(data["lowercase"])
+            # Exports from before the preprocessor was supported don't have the key
+            self.letters_only = "letters_only" in data.files and bool(data["letters_only"])
+            self.ngram_range = tuple(int(x) for x in data["ngram_range"])
+            self.stop_words = frozenset(data["stop_words"].tolist())
+            self.sublinear_tf = bool(data["sublinear_tf"])
+            self.norm = str(data["norm"])
+
+    def _features(self, text):
+        """
+        (feature indices, tf-idf values) of one text, the same analysis as TfidfVectorizer.
+        """
+        # A preprocessor replaces sklearn's lowercasing, like in TfidfVectorizer.build_preprocessor
+        if self.letters_only:
+            text = letters_only(text)
+        elif self.lowercase:
+            text = text.lower()
+        tokens = [t for t in self.token_pattern.findall(text) if t not in self.stop_words]
+        low, high = self.ngram_range
+        grams = []
+        for n in range(low, high + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        counts = Counter(self.vocabulary[g] for g in grams if g in self.vocabulary)
+        if not counts:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        tf = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if self.sublinear_tf:
+            tf = np.log(tf) + 1.0
+        values = tf * self.idf[indices]
+        if self.norm == "l2":
+            values /= math.sqrt(float(values @ values)) or 1.0
+        elif self.norm == "l1":
+            values /= float(np.abs(values).sum()) or 1.0
+        return indices, values
+
+    def scores(self, texts):
+        """
+        Decision scores of both heads, one row per text: values @ weights[indices] + intercepts.
+        """
+        out = np.tile(self.intercepts, (len(texts), 1))
+        for row, text in enumerate(texts):
+            indices, values = self._features(text or "")
+            if len(indices):
+                out[row] += values @ self.weights[indices]
+        return out
+
+    def _labels(self, scores, classes):
+        if scores.shape[1] == 1:
+            return [classes[int(s > 0)] for s in scores[:, 0]]
+        return [classes[i] for i in scores.argmax(axis=1)]
+
+    def predict(self, texts):
+        """
+        [(crime_type, severity), ...]
+        """
+        s = self.scores(texts)
+        types = self._labels(s[:, :self.type_rows], self.type_classes)
+        severities = self._labels(s[:, self.type_rows:], self.severity_classes)
+        return list(zip(types, severities))
+
+    def predict_proba(self, texts):
+        """
+        (crime type labels, crime type probabilities, severity labels, severity probabilities)
+        """
+        s = self.scores(texts)
+        type_proba = _head_proba(s[:, :self.type_rows], self.type_ovr)
+        sev_proba = _head_proba(s[:, self.type_rows:], self.severity_ovr)
+        types = [self.type_classes[i] for i in type_proba.argmax(axis=1)]
+        severities = [self.severity_classes[i] for i in sev_proba.argmax(axis=1)]
+        return types, type_proba, severities, sev_proba
+
+
+def export_bundle(bundle_path, path):
+    """
+    Exports a saved model bundle (see modules/model_bundle.py).
+    """
+    from modules import model_bundle
+
+    bundle = model_bundle.load_bundle(bundle_path, mmap=False)
+    export(bundle["vectorizer"], bundle["crime_type_model"], bundle["severity_model"], path,
+           version=bundle["metadata"].get("version", ""))
+
+
+if __name__ == "__main__":
+    import config
+
+    export_bundle(config.CLASSIFIER_BUNDLE_PATH, config.CLASSIFIER_FAST_PATH)
+    print(f"✅ Fast classifier written to {config.CLASSIFIER_FAST_PATH}")
@@ -0,0 +1,184 @@
+import os
+import time
+
+from modules import metrics, result_cache
+from modules.stage_executor import Stage, run_stages
+from modules.ocr_extractor import extract_text
+from modules.fir_simplifier import simplify_fir_text
+from modules.translator import translate_to_language
+from modules.tts_generator import text_to_speech
+from modules.outcome_predictor import predict_outcome
+from modules.classifier import predict_crime
+from modules.ipc_explainer import extract_ipc_sections
+from modules.legal_summarizer import summarize_legal_text
+# legal_dictionary.explain_terms is optional
+try:
+    from modules.legal_dictionary import explain_terms
+    HAS_EXPLAIN_TERMS = True
+except Exception:
+    HAS_EXPLAIN_TERMS = False
+
+EXTRACTION_ERROR = "❌ Could not extract text from the uploaded file. Please try a clearer scan or use a text file."
+
+
+def _is_message(text):
+    # Error / warning strings produced by the modules start with these markers
+    return text.startswith(("❌", "⚠️"))
+
+
+def _simplify(extracted_text, on_token=None):
+    return simplify_fir_text(extracted_text, on_token=on_token) or "⚠️ Simplification unavailable."
+
+
+def _translate(simplified, user_language):
+    # Only translate when another language was requested and simplification worked
+    if user_language != 'en' and not _is_message(simplified):
+        return translate_to_language(simplified, user_language)
+    return None
+
+
+def _classify(simplified):
+    return predict_crime(simplified)
+
+
+# Stage functions receive their deps as keyword arguments, so modules whose
+# parameters are named differently are adapted here
+def _summarize(extracted_text):
+    return summarize_legal_text(extracted_text)
+
+
+def _predict_outcome(simplified):
+    return predict_outcome(simplified)
+
+
+def _extract_ipc(extracted_text):
+    return extract_ipc_sections(extracted_text)
+
+
+def _explain_terms(extracted_text):
+    return explain_terms(extracted_text)
+
+
+def _tts(simplified, translated, user_language):
+    # Audio for the translated text if present else for simplified text
+    text_for_tts = translated if translated else simplified
+    if not text_for_tts or _is_message(text_for_tts):
+        return None
+    # Stored by content hash, so repeated texts reuse the same file
+    saved_filename = text_to_speech(text_for_tts, lang=user_language)
+    # text_to_speech returns the full path; templates need the basename
+    return os.path.basename(saved_filename) if saved_filename else None
+
+
+def build_stages(enable_term_explanations=False, on_token=None):
+    """
+    Stages of the upload pipeline and what each one needs.
+    Summary, IPC extraction and term explanations only need the extracted text,
+    so they run alongside simplification; the rest wait for the simplified text.
+    on_token receives the simplified text as it is generated.
+    """
+    stages = [
+        Stage("simplified", lambda extracted_text: _simplify(extracted_text, on_token),
+              deps=["extracted_text"], fallback="⚠️ Simplification unavailable.",
+              error_label="⚠️ Simplification error:"),
+        Stage("translated", _translate, deps=["simplified", "user_language"],
+              fallback=None, error_label="❌ Translation error:"),
+        Stage("summary", _summarize, deps=["extracted_text"],
+              fallback="⚠️ Summarization unavailable.", error_label="⚠️ Summarization error:"),
+        Stage("crime", _classify, deps=["simplified"],
+              fallback=("Unknown", "Unknown"), error_label="⚠️ crime classification error:"),
+        Stage("outcome", _predict_outcome, deps=["simplified"],
+              fallback="Outcome unavailable.", error_label="⚠️ outcome predictor error:"),
+        Stage("ipc_results", _extract_ipc, deps=["extracted_text"],
+              fallback=[], error_label="⚠️ ipc extraction error:"),
+        Stage("audio_file", _tts, deps=["simplified", "translated", "user_language"],
+              fallback=None, error_label="⚠️ TTS error:"),
+    ]
+    if enable_term_explanations and HAS_EXPLAIN_TERMS:
+        stages.append(Stage("term_explanations", _explain_terms, deps=["extracted_text"],
+                            fallback={}, error_label="⚠️ explain_terms error:"))
+    return stages
+
+
+def stage_context(name, value):
+    """
+    The result.html fields produced by one stage.
+    """
+    if name == "crime":
+        crime_type, severity = value
+        return {"crime_type": crime_type, "severity": severity}
+    field = {
+        "simplified": "simplified_text",
+        "translated": "translated_text",
+        "outcome": "crime_outcome",
+    }.get(name, name)
+    return {field: value}
+
+
+def process_fir(extracted_text, user_language="en", enable_term_explanations=False, on_stage_done=None,
+                on_token=None):
+    """
+    Runs every analysis stage on already-extracted FIR text.
+    on_stage_done(name, fields, seconds) receives each stage's result.html fields as soon as it finishes;
+    on_token(piece) receives the simplified text while it is generated (from a stage thread);
+    on_token(None) means discard what it received so far (see simplify_fir_text).
+    Returns (context, timings): context holds the values result.html expects,
+    timings maps stage names to seconds.
+    """
+    context = {
+        "extracted_text": extracted_text,
+        "user_language": user_language,
+        "term_explanations": {},
+    }
+
+    def _done(name, value, seconds):
+        fields = stage_context(name, value)
+        context.update(fields)
+        if on_stage_done is not None:
+            on_stage_done(name, fields, seconds)
+
+    _results, timings = run_stages(
+        build_stages(enable_term_explanations, on_token),
+        inputs={"extracted_text": extracted_text, "user_language": user_language},
+        on_stage_done=_done,
+    )
+    print("[INFO] Stage timings: " + ", ".join(f"{n}={t:.2f}s" for n, t in timings.items()))
+    return context, timings
+
+
+def _extract(source, filename=None, content_hash=None):
+    """
+    extract_text(), reusing the stored extraction of a byte-identical earlier upload
+    (content_hash is its SHA-256) instead of running OCR again.
+    """
+    if content_hash is None:
+        return extract_text(source, filename)
+    # The extension is part of the key: the same bytes uploaded as .txt and .pdf read differently
+    ext = os.path.splitext(filename or "")[1].lower()
+    extracted_text = result_cache.get("extract", content_hash, ext)
+    if extracted_text is None:
+        extracted_text = extract_text(source, filename)
+        result_cache.put("extract", content_hash, extracted_text, ext)
+    return extracted_text
+
+
+def run_upload(source, user_language="en", enable_term_explanations=False, on_stage_done=None, on_token=None,
+               filename=None, content_hash=None):
+    """
+    Full pipeline for an uploaded file: text extraction followed by process_fir().
+    source is a path, bytes or a binary file object (filename then gives the file type);
+    with content_hash, a file seen before skips extraction.
+    Returns (context, timings, error); error is a user-facing message when extraction failed.
+    """
+    start = time.perf_counter()
+    extracted_text = _extract(source, filename, content_hash)
+    seconds = time.perf_counter() - start
+    metrics.observe("fir_stage_seconds", seconds, stage="extracted_text")
+    if not extracted_text or not extracted_text.strip() or extracted_text.startswith("❌"):
+        return None, {"extracted_text": seconds}, EXTRACTION_ERROR
+    if on_stage_done is not None:
+        on_stage_done("extracted_text", {"extracted_text": extracted_text}, seconds)
+
+    context, timings = process_fir(extracted_text, user_language, enable_term_explanations, on_stage_done,
+                                   on_token)
+    return context, dict(timings, extracted_text=seconds), None
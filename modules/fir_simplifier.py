@@ -1,51 +1,91 @@
-import os
+import importlib.util
 import traceback
 
-# Try Gemini first
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
+import config
+from modules.model_registry import get_model, SUMMARIZER
+from modules import gemini_client, result_cache, long_summarizer, metrics
 
-# Try Hugging Face summarizer
-try:
-    from transformers import pipeline
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    HF_AVAILABLE = True
-except Exception:
-    HF_AVAILABLE = False
+# Hugging Face summarizer is shared through the model registry and loaded on first use
+HF_AVAILABLE = importlib.util.find_spec("transformers") is not None
 
 
-def simplify_fir_text(text: str) -> str:
+def simplify_fir_text(text: str, budget=None, on_token=None, report=None) -> str:
     """
     Simplifies or summarizes a given FIR/crime report text.
     Prefers Gemini if API key configured; otherwise uses HuggingFace.
+    Gemini gets at most `budget` seconds (default SIMPLIFY_BUDGET); after that the
+    request falls back to HuggingFace / truncation and a late Gemini answer is cached.
+    on_token(piece) receives the simplified text as it is generated; the returned text
+    is authoritative. If Gemini fails after streaming part of its answer, on_token(None) is
+    called before the fallback streams its own text: discard what was received so far.
+    If given, report["source"] is set to what produced the text: cache, gemini, bart or truncated.
     """
+    report = {} if report is None else report
     if not text or text.strip() == "":
         return "❌ No text provided."
 
+    cached = result_cache.get("simplify", text)
+    if cached is not None:
+        report["source"] = "cache"
+        if on_token is not None:
+            on_token(cached)
+        return cached
+
+    # True once Gemini missed the budget: its late answer is what gets cached
+    hedged = False
+    # True once part of a Gemini answer went to on_token
+    streamed = False
     try:
         # --- Option 1: Gemini AI (if available)
-        if GEMINI_AVAILABLE and os.getenv("GEMINI_API_KEY"):
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            model = genai.GenerativeModel("gemini-pro")
+        if gemini_client.is_available():
             prompt = (
                 "Simplify this FIR report into easy-to-understand English, "
                 "keeping all important legal details:\n\n" + text
             )
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            budget = config.SIMPLIFY_BUDGET if budget is None else budget
+            on_late = lambda late: result_cache.put("simplify", text, late)
+            try:
+                if on_token is not None:
+                    parts = []
+                    for piece in gemini_client.stream(prompt, budget=budget or None, on_late_result=on_late):
+                        parts.append(piece)
+                        streamed = True
+                        on_token(piece)
+                    simplified = "".join(parts).strip()
+                else:
+                    simplified = gemini_client.generate(prompt, budget=budget or None, on_late_result=on_late)
+                result_cache.put("simplify", text, simplified)
+                report["source"] = "gemini"
+                return simplified
+            except gemini_client.GeminiTimeout as e:
+                print(f"⚠️ {e}; falling back to the local summarizer")
+                metrics.inc("fir_simplify_fallbacks_total", reason="deadline")
+                hedged = True
+            except Exception as e:
+                print(f"⚠️ Gemini error: {e}; falling back to the local summarizer")
+                metrics.inc("fir_simplify_fallbacks_total", reason="error")
+            if streamed:
+                on_token(None)
 
         # --- Option 2: Hugging Face summarization
-        elif HF_AVAILABLE:
-            summary = summarizer(text, max_length=180, min_length=60, do_sample=False)
-            return summary[0]["summary_text"].strip()
+        summarizer = get_model(SUMMARIZER) if HF_AVAILABLE else None
+        if summarizer is not None:
+            with metrics.timed("fir_backend_seconds", backend="bart"):
+                simplified, _report = long_summarizer.summarize(summarizer, text, max_length=180, min_length=60,
+                                                                on_token=on_token)
+            # A streamed summary is decoded greedily and differs from the beam-search one that
+            # '/' produces, so only the latter is cached under the shared key
+            if not hedged and on_token is None:
+                result_cache.put("simplify", text, simplified)
+            report["source"] = "bart"
+            return simplified
 
         # --- Option 3: Fallback simple truncation
-        else:
-            simplified = " ".join(text.split()[:150])
-            return simplified + "... (summary truncated - no AI model active)"
+        simplified = " ".join(text.split()[:150]) + "... (summary truncated - no AI model active)"
+        report["source"] = "truncated"
+        if on_token is not None:
+            on_token(simplified)
+        return simplified
 
     except Exception as e:
         traceback.print_exc()
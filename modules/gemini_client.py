@@ -0,0 +1,200 @@
+import hashlib
+import importlib.util
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import config
+from modules import metrics
+
+# The SDK is imported only when the first request is made
+try:
+    SDK_AVAILABLE = importlib.util.find_spec("google.generativeai") is not None
+except ModuleNotFoundError:
+    SDK_AVAILABLE = False
+
+
+class GeminiTimeout(Exception):
+    """The latency budget ran out before Gemini answered (the call keeps running)."""
+
+
+# ---- Backends ----
+class GoogleBackend:
+    """
+    google.generativeai, configured once. The GenerativeModel (and its connection) is reused
+    for every request; each call has a hard upstream timeout.
+    """
+    def __init__(self):
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        self.model = genai.GenerativeModel(config.GEMINI_MODEL)
+
+    def generate(self, prompt):
+        response = self.model.generate_content(prompt, request_options={"timeout": config.GEMINI_TIMEOUT})
+        return response.text.strip()
+
+    def generate_stream(self, prompt):
+        response = self.model.generate_content(prompt, stream=True,
+                                               request_options={"timeout": config.GEMINI_TIMEOUT})
+        for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class LocalBackend:
+    """
+    Offline stand-in: answers with the first 80 words of the prompt's text after `delay` seconds.
+    """
+    def __init__(self, delay=None):
+        self.delay = config.GEMINI_LOCAL_DELAY if delay is None else delay
+        self.calls = 0
+
+    def generate(self, prompt):
+        return "".join(self.generate_stream(prompt))
+
+    def generate_stream(self, prompt):
+        # The delay comes before the first chunk, like the time to first token of the real service
+        self.calls += 1
+        time.sleep(self.delay)
+        text = prompt.split("\n\n", 1)[-1]
+        yield "Simplified:"
+        for word in text.split()[:80]:
+            yield " " + word
+
+
+BACKENDS = {"google": GoogleBackend, "local": LocalBackend}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def is_available():
+    """
+    True when Gemini can be called: the local backend, or the SDK with an API key.
+    """
+    if _backend is not None or config.GEMINI_BACKEND == "local":
+        return True
+    return SDK_AVAILABLE and bool(os.getenv("GEMINI_API_KEY"))
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = BACKENDS[config.GEMINI_BACKEND]()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Replaces the backend (any object with generate(prompt) -> text).
+    """
+    global _backend
+    _backend = backend
+
+
+# ---- Calls: shared pool, concurrent identical prompts merged into one call ----
+_pool = None
+_pool_lock = threading.Lock()
+_inflight = {}  # prompt hash -> Future
+_inflight_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=config.GEMINI_WORKERS, thread_name_prefix="gemini")
+    return _pool
+
+
+def _call(prompt):
+    with metrics.timed("fir_backend_seconds", backend="gemini"):
+        return get_backend().generate(prompt)
+
+
+def generate(prompt, budget=None, on_late_result=None):
+    """
+    Gemini's answer to the prompt, waiting at most `budget` seconds (None = no budget).
+    A request for a prompt that is already in flight waits for that call instead of making another.
+    Raises GeminiTimeout when the budget runs out; the call itself carries on and, if given,
+    on_late_result(text) receives its answer when it arrives.
+    """
+    key = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    with _inflight_lock:
+        future = _inflight.get(key)
+        leader = future is None
+        if leader:
+            future = _inflight[key] = _get_pool().submit(_call, prompt)
+    # Registered outside the lock: a call that already finished runs the callback right here
+    if leader:
+        future.add_done_callback(lambda f: _forget(key, f))
+    metrics.inc("fir_gemini_requests_total", result="call" if leader else "merged")
+
+    try:
+        return future.result(timeout=budget)
+    except FutureTimeout:
+        metrics.inc("fir_gemini_requests_total", result="deadline")
+        if on_late_result is not None:
+            future.add_done_callback(lambda f: on_late_result(f.result()) if f.exception() is None else None)
+        raise GeminiTimeout(f"no answer from Gemini within {budget:.1f}s")
+
+
+def _forget(key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def stream(prompt, budget=None, on_late_result=None):
+    """
+    Yields Gemini's answer in chunks as they are generated. Streams are not merged.
+    Raises GeminiTimeout when the first chunk does not arrive within `budget` seconds; once
+    text is flowing each further chunk may take up to GEMINI_TIMEOUT. If the caller gave up,
+    on_late_result(text) receives the complete answer when the stream ends.
+    """
+    chunks = queue.Queue()
+    abandoned = threading.Event()
+
+    def produce():
+        parts = []
+        try:
+            with metrics.timed("fir_backend_seconds", backend="gemini"):
+                backend = get_backend()
+                pieces = backend.generate_stream(prompt) if hasattr(backend, "generate_stream") \
+                    else [backend.generate(prompt)]
+                for piece in pieces:
+                    parts.append(piece)
+                    chunks.put(("chunk", piece))
+            chunks.put(("end", None))
+            if abandoned.is_set() and on_late_result is not None:
+                on_late_result("".join(parts).strip())
+        except Exception as e:
+            chunks.put(("error", e))
+
+    metrics.inc("fir_gemini_requests_total", result="stream")
+    _get_pool().submit(produce)
+    deadline = time.monotonic() + budget if budget else None
+    first = True
+    while True:
+        if first and deadline is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+        else:
+            timeout = config.GEMINI_TIMEOUT
+        try:
+            kind, value = chunks.get(timeout=timeout)
+        except queue.Empty:
+            abandoned.set()
+            if first:
+                metrics.inc("fir_gemini_requests_total", result="deadline")
+                raise GeminiTimeout(f"no answer from Gemini within {budget:.1f}s")
+            raise GeminiTimeout(f"Gemini stream stalled for {timeout:.0f}s")
+        if kind == "end":
+            return
+        if kind == "error":
+            raise value
+        first = False
+        yield value
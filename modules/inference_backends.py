@@ -0,0 +1,60 @@
+import os
+
+import config
+
+# Summarization backends, chosen with SUMMARIZER_BACKEND:
+#   pytorch - the plain fp32 transformers pipeline
+#   int8    - the same model with its Linear layers dynamically quantized to int8 (CPU only)
+#   onnx    - the model exported to ONNX and run with onnxruntime (needs `optimum[onnxruntime]`)
+BACKENDS = ("pytorch", "int8", "onnx")
+
+
+def _set_threads():
+    if config.TORCH_THREADS:
+        import torch
+        torch.set_num_threads(config.TORCH_THREADS)
+
+
+def _load_pytorch(model_name):
+    from transformers import pipeline
+    return pipeline("summarization", model=model_name)
+
+
+def _load_int8(model_name):
+    import torch
+    from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name).eval()
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=quantized, tokenizer=tokenizer, device=-1)
+
+
+def _load_onnx(model_name):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+    export_dir = os.path.join(config.ONNX_MODEL_DIR, model_name.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+        tokenizer = AutoTokenizer.from_pretrained(export_dir)
+    else:
+        # First use: export once and keep the graph for later starts
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_dir)
+        tokenizer.save_pretrained(export_dir)
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+
+_LOADERS = {"pytorch": _load_pytorch, "int8": _load_int8, "onnx": _load_onnx}
+
+
+def load_summarizer(backend=None, model_name=None):
+    """
+    Builds a summarization pipeline on the requested backend.
+    All backends return an object with the transformers pipeline call signature and a .tokenizer.
+    """
+    backend = backend or config.SUMMARIZER_BACKEND
+    if backend not in _LOADERS:
+        raise ValueError(f"Unknown summarizer backend '{backend}', expected one of {BACKENDS}")
+    _set_threads()
+    return _LOADERS[backend](model_name or config.SUMMARIZER_MODEL)
@@ -1,25 +1,104 @@
 import re
 import json
 import os
+import threading
+
+IPC_JSON_PATH = os.path.join(os.path.dirname(__file__), "ipc_data.json")
+
+# Section numbers look like 379, 498A or 120B
+_SECTION = r'\d{1,3}[A-Za-z]{0,2}\b'
+# "IPC", "I.P.C.", "of the Indian Penal Code" after a section number
+_CODE = r'(?i:(?:of\s+(?:the\s+)?)?(?:\bI\.?\s?P\.?\s?C\b\.?|\bIndian\s+Penal\s+Code\b))'
+# "457 and 380", "420/406", "356, 379", "457 & 380", "302 r/w 34", "498A IPC and 406"
+_SECTION_LIST = (_SECTION + r'(?:(?:\s*' + _CODE + r')?\s*(?:,|&|/|(?i:and|or|r/w|read\s+with))\s*'
+                 + _SECTION + r')*')
+# IPC, I.P.C., Indian Penal Code, Section(s), Sec., u/s
+_ANCHOR = r'(?i:\bI\.?\s?P\.?\s?C\b\.?|\bIndian\s+Penal\s+Code\b|\bsec(?:tion)?s?\b\.?|\bu/s\b\.?)'
+_IPC_PATTERN = re.compile(
+    # "IPC 379", "u/s 457 & 380", "Sections 420/406 of IPC"
+    _ANCHOR + r'\s*[:\-]?\s*(' + _SECTION_LIST + r')'
+    # "379 IPC", "420/406 I.P.C.", "323 and 506 of the Indian Penal Code"
+    r'|(' + _SECTION_LIST + r')\s*' + _CODE
+)
+_SECTION_NUMBER = re.compile(_SECTION)
+
+# Process-wide index, rebuilt only when ipc_data.json changes on disk
+_index = {"mtime": None, "data": {}, "details": {}}
+_lock = threading.Lock()
+
+
+def _build_details(sec, entry):
+    return {
+        "section": f"IPC {sec}",
+        "description": entry.get("description", "No description available"),
+        "punishment": entry.get("punishment", "No punishment available")
+    }
+
+
+def _refresh():
+    mtime = os.path.getmtime(IPC_JSON_PATH)
+    if mtime == _index["mtime"]:
+        return _index
+    with _lock:
+        if mtime != _index["mtime"]:
+            with open(IPC_JSON_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            details = {sec.upper(): _build_details(sec.upper(), entry) for sec, entry in data.items()}
+            _index.update(data=data, details=details, mtime=mtime)
+    return _index
+
 
 def load_ipc_data():
-    json_path = os.path.join(os.path.dirname(__file__), "ipc_data.json")
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """
+    Returns the raw IPC data (section -> entry). Cached; reloaded when the file changes.
+    """
+    return _refresh()["data"]
 
-def extract_ipc_sections(text):
-    ipc_data = load_ipc_data()
-    found = re.findall(r'(?:IPC|Section)?\s*(\d+[A-Z]?)', text, re.IGNORECASE)
+
+def normalize_section(section):
+    """
+    "ipc 498a" / "Section 379" -> "498A" / "379"
+    """
+    section = str(section).strip().upper()
+    section = re.sub(r'^(?:IPC|SECTION|SEC\.?|U/S)\s*', '', section)
+    return section.strip()
+
+
+def get_sections(sections):
+    """
+    Bulk lookup: returns details for every known section in `sections`, in order.
+    Unknown sections are skipped.
+    """
+    details = _refresh()["details"]
     results = []
     seen = set()
-    for sec in found:
-        sec = sec.upper()
-        if sec in seen or sec not in ipc_data:
+    for sec in sections:
+        sec = normalize_section(sec)
+        if sec in seen or sec not in details:
             continue
         seen.add(sec)
-        results.append({
-            "section": f"IPC {sec}",
-            "description": ipc_data[sec].get("description", "No description available"),
-            "punishment": ipc_data[sec].get("punishment", "No punishment available")
-        })
-    return results
\ No newline at end of file
+        results.append(dict(details[sec]))
+    return results
+
+
+def get_section(section):
+    """
+    Details for a single section, or None if it is not in the data.
+    """
+    found = get_sections([section])
+    return found[0] if found else None
+
+
+def find_section_numbers(text):
+    """
+    Section numbers mentioned next to IPC / Section / u/s in the text, in order of appearance.
+    Plain numbers (dates, amounts, FIR numbers) are ignored.
+    """
+    numbers = []
+    for match in _IPC_PATTERN.finditer(text):
+        numbers.extend(n.upper() for n in _SECTION_NUMBER.findall(match.group(1) or match.group(2)))
+    return numbers
+
+
+def extract_ipc_sections(text):
+    return get_sections(find_section_numbers(text))
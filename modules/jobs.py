@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+import traceback
+import uuid
+
+import config
+
+# Jobs live in this process only: with several WSGI worker processes,
+# status/event requests must reach the process that accepted the job (sticky sessions).
+
+
+class JobQueueFull(Exception):
+    """Raised by submit() when the job queue is at capacity."""
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = "queued"  # queued -> running -> done | failed
+        self.events = []
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def add_event(self, event, data):
+        with self._cond:
+            self.events.append({"event": event, "data": data})
+            self._cond.notify_all()
+
+    def _finish(self, status, result=None, error=None):
+        with self._cond:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.finished_at = time.time()
+            self.events.append({"event": status, "data": {"error": error} if error else {}})
+            self._cond.notify_all()
+
+    def wait_events(self, start, timeout):
+        """
+        Events after index `start`, waiting up to `timeout` seconds for new ones.
+        Returns (events, finished).
+        """
+        with self._cond:
+            if len(self.events) <= start and not self.finished:
+                self._cond.wait(timeout)
+            return self.events[start:], self.finished
+
+    def to_dict(self):
+        with self._cond:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "stages_done": [e["event"] for e in self.events
+                                if e["event"] not in ("done", "failed", "token", "token_reset")],
+                "result": self.result,
+                "error": self.error,
+            }
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+_queue = queue.Queue(maxsize=config.JOB_QUEUE_SIZE)
+_workers = []
+_workers_lock = threading.Lock()
+
+
+def _worker():
+    while True:
+        job, func, args = _queue.get()
+        try:
+            job.status = "running"
+            job._finish("done", result=func(job, *args))
+        except Exception as e:
+            traceback.print_exc()
+            job._finish("failed", error=str(e))
+        finally:
+            _queue.task_done()
+
+
+def _ensure_workers():
+    if _workers:
+        return
+    with _workers_lock:
+        while len(_workers) < config.JOB_WORKERS:
+            t = threading.Thread(target=_worker, name=f"job-worker-{len(_workers)}", daemon=True)
+            t.start()
+            _workers.append(t)
+
+
+def _purge_expired():
+    cutoff = time.time() - config.JOB_TTL
+    with _jobs_lock:
+        for job_id in [j.id for j in _jobs.values() if j.finished and j.finished_at < cutoff]:
+            del _jobs[job_id]
+
+
+def submit(func, *args):
+    """
+    Queues func(job, *args) on the background workers and returns the Job.
+    func's return value becomes job.result; it may report progress with job.add_event().
+    Raises JobQueueFull when JOB_QUEUE_SIZE jobs are already waiting.
+    """
+    _ensure_workers()
+    _purge_expired()
+    job = Job(uuid.uuid4().hex)
+    with _jobs_lock:
+        _jobs[job.id] = job
+    try:
+        _queue.put_nowait((job, func, args))
+    except queue.Full:
+        with _jobs_lock:
+            del _jobs[job.id]
+        raise JobQueueFull(f"{config.JOB_QUEUE_SIZE} jobs already queued")
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def queue_depth():
+    return _queue.qsize()
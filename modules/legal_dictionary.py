@@ -1,27 +1,67 @@
-LEGAL_TERMS = {
-    "FIR": "First Information Report – the first step to report a crime to the police.",
-    "bail": "Temporary release of an accused person before trial, sometimes requiring money as a guarantee.",
-    "cognizance": "When a court takes official notice of an offence and starts proceedings.",
-    "charge sheet": "The police report filed after investigation, listing evidence and witnesses.",
-    "warrant": "A legal order issued by a court allowing police to arrest, search, or seize property.",
-    "indemnity": "A promise to compensate someone for loss or damage.",
-    "plaintiff": "The person who brings a case to court.",
-    "defendant": "The person accused or sued in a case.",
-    "contract": "A legal agreement enforceable by law.",
-    "termination clause": "Part of a contract that explains how the agreement can be ended.",
-    "jurisdiction": "The legal authority of a court to hear a case.",
-    "negligence": "Failure to take proper care, resulting in damage or harm.",
-    "penalty": "Punishment or fine for breaking a law or contract.",
-    "probation": "Release of an offender under supervision instead of jail time.",
-    "summons": "An official order to appear before a court."
-}
+import json
+import os
+import threading
+
+from modules.term_matcher import TermMatcher
+
+LEGAL_TERMS_PATH = os.getenv("LEGAL_TERMS_PATH", os.path.join(os.path.dirname(__file__), "legal_terms.json"))
+
+
+def load_legal_terms(path=LEGAL_TERMS_PATH):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Read through the module (legal_dictionary.LEGAL_TERMS): reload_legal_terms() replaces it
+LEGAL_TERMS = load_legal_terms()
+
+# (terms, matcher) published as one tuple, so a reader always gets the matcher built from the
+# dict it takes definitions from. The matcher is built on first use (None until then).
+_current = (LEGAL_TERMS, None)
+_matcher_lock = threading.Lock()
+
+
+def _get_current():
+    global _current
+    terms, matcher = _current
+    if matcher is None:
+        with _matcher_lock:
+            terms, matcher = _current
+            if matcher is None:
+                matcher = TermMatcher(terms)
+                _current = (terms, matcher)
+    return terms, matcher
+
+
+def reload_legal_terms(path=LEGAL_TERMS_PATH):
+    """
+    Re-reads the glossary file and rebuilds the matcher.
+    """
+    global LEGAL_TERMS, _current
+    terms = load_legal_terms(path)
+    matcher = TermMatcher(terms)
+    with _matcher_lock:
+        _current = (terms, matcher)
+        LEGAL_TERMS = terms
+
+
+def find_terms(text: str) -> list:
+    """
+    Legal terms in the text with their character offsets, for highlighting:
+    [{"term", "start", "end", "definition"}, ...] in order, non-overlapping.
+    """
+    terms, matcher = _get_current()
+    return [
+        {"term": term, "start": start, "end": end, "definition": terms[term]}
+        for start, end, term in matcher.find(text)
+    ]
+
 
 def explain_terms(text: str) -> dict:
     """
     Scan the text and return dictionary of legal terms with explanations.
     """
     explanations = {}
-    for term, definition in LEGAL_TERMS.items():
-        if term.lower() in text.lower():
-            explanations[term] = definition
+    for match in find_terms(text):
+        explanations.setdefault(match["term"], match["definition"])
     return explanations
@@ -1,11 +1,11 @@
+import importlib.util
 import traceback
 
-try:
-    from transformers import pipeline
-    summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-    MODEL_AVAILABLE = True
-except Exception:
-    MODEL_AVAILABLE = False
+from modules.model_registry import get_model, SUMMARIZER
+from modules import result_cache, long_summarizer, metrics
+
+# The BART pipeline is shared with fir_simplifier and loaded on first use
+MODEL_AVAILABLE = importlib.util.find_spec("transformers") is not None
 
 def summarize_legal_text(text: str) -> str:
     """
@@ -14,10 +14,17 @@ def summarize_legal_text(text: str) -> str:
     if not text or text.strip() == "":
         return "❌ Empty text provided for summarization."
 
+    cached = result_cache.get("summary", text)
+    if cached is not None:
+        return cached
+
     try:
-        if MODEL_AVAILABLE:
-            summary = summarizer(text, max_length=150, min_length=50, do_sample=False)
-            return summary[0]['summary_text'].strip()
+        summarizer = get_model(SUMMARIZER) if MODEL_AVAILABLE else None
+        if summarizer is not None:
+            with metrics.timed("fir_backend_seconds", backend="bart"):
+                summary, _report = long_summarizer.summarize(summarizer, text, max_length=150, min_length=50)
+            result_cache.put("summary", text, summary)
+            return summary
         else:
             # fallback
             return " ".join(text.split()[:100]) + "... (summary truncated - model not loaded)"
@@ -0,0 +1,171 @@
+import re
+import threading
+import time
+
+import config
+
+# Sentence ends: ., ! or ? followed by whitespace, or a line break
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+# Map/reduce rounds before the partial summaries are sized to fit into one chunk
+_MAX_ROUNDS = 5
+
+
+def split_sentences(text):
+    return [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+
+
+def _token_counts(tokenizer, pieces):
+    # One tokenizer call for all pieces
+    encoded = tokenizer(pieces, add_special_tokens=False)["input_ids"]
+    return [len(ids) for ids in encoded]
+
+
+def chunk_text(text, tokenizer, max_tokens=None):
+    """
+    Splits text into sentence-aligned chunks of at most max_tokens tokens.
+    A single sentence longer than the limit is split on word boundaries.
+    Returns a list of (chunk_text, token_count).
+    """
+    max_tokens = max_tokens or config.SUMMARY_CHUNK_TOKENS
+    sentences = split_sentences(text)
+    if not sentences:
+        return []
+
+    pieces = []
+    for sentence, count in zip(sentences, _token_counts(tokenizer, sentences)):
+        if count <= max_tokens:
+            pieces.append((sentence, count))
+            continue
+        # Overlong sentence: cut it into word windows sized by the average tokens per word
+        words = sentence.split()
+        per_window = max(1, int(len(words) * max_tokens / count * 0.9))
+        windows = [" ".join(words[i:i + per_window]) for i in range(0, len(words), per_window)]
+        pieces.extend(zip(windows, _token_counts(tokenizer, windows)))
+
+    chunks, current, current_tokens = [], [], 0
+    for piece, count in pieces:
+        if current and current_tokens + count > max_tokens:
+            chunks.append((" ".join(current), current_tokens))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += count
+    if current:
+        chunks.append((" ".join(current), current_tokens))
+    return chunks
+
+
+def _stream_final(summarizer, text, max_length, min_length, on_token):
+    """
+    The final summary generated token by token with a TextIteratorStreamer; on_token gets each
+    decoded piece. Streaming needs greedy decoding (transformers streamers do not support beam
+    search), so the streamed summary can differ slightly from the pipeline's beam-search one.
+    """
+    from transformers import TextIteratorStreamer
+
+    model, tokenizer = summarizer.model, summarizer.tokenizer
+    inputs = tokenizer(text, return_tensors="pt", truncation=True,
+                       max_length=tokenizer.model_max_length).to(model.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def generate():
+        try:
+            model.generate(**inputs, streamer=streamer, max_length=max_length, min_length=min_length,
+                           num_beams=1, do_sample=False)
+        except Exception as e:
+            # Without end() the loop below would wait for tokens forever
+            errors.append(e)
+            streamer.end()
+
+    worker = threading.Thread(target=generate, daemon=True)
+    worker.start()
+    parts = []
+    for piece in streamer:
+        if piece:
+            parts.append(piece)
+            on_token(piece)
+    worker.join()
+    if errors:
+        raise errors[0]
+    return "".join(parts).strip()
+
+
+def _map_round(summarizer, chunks, report, max_length, min_length):
+    """
+    Summarizes every chunk (in batches of SUMMARY_BATCH_SIZE) and returns the partial summaries.
+    """
+    partials = []
+    batch_size = max(1, config.SUMMARY_BATCH_SIZE)
+    for b in range(0, len(chunks), batch_size):
+        batch = chunks[b:b + batch_size]
+        batch_start = time.perf_counter()
+        outputs = summarizer(
+            [c for c, _ in batch],
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(batch),
+        )
+        # Chunks in one batch share a forward pass, so they share its time
+        per_chunk = (time.perf_counter() - batch_start) / len(batch)
+        for (_, tokens), out in zip(batch, outputs):
+            partials.append(out["summary_text"].strip())
+            report["chunks"].append({"round": report["reduce_rounds"], "tokens": tokens,
+                                     "seconds": round(per_chunk, 3)})
+    report["reduce_rounds"] += 1
+    return partials
+
+
+def summarize(summarizer, text, max_length, min_length, on_token=None):
+    """
+    Summarizes text of any length with a transformers summarization pipeline.
+    Text that fits the model is summarized directly. Longer text is split into
+    token-bounded chunks which are summarized in batches (map), then the partial
+    summaries are summarized again (reduce) until they fit. If they still don't after
+    _MAX_ROUNDS, further rounds give each chunk an equal share of one chunk's tokens.
+    With on_token the final summary is streamed to on_token piece by piece as it is generated.
+    Returns (summary, report) where report has per-chunk token counts and timings, and
+    "truncated" set when part of the text had to be left out of the final summary.
+    """
+    tokenizer = summarizer.tokenizer
+    report = {"chunks": [], "reduce_rounds": 0, "truncated": False}
+    start = time.perf_counter()
+
+    chunks = chunk_text(text, tokenizer)
+    while len(chunks) > 1 and report["reduce_rounds"] < _MAX_ROUNDS:
+        partials = _map_round(summarizer, chunks, report, config.SUMMARY_CHUNK_MAX_LENGTH,
+                              min(config.SUMMARY_CHUNK_MIN_LENGTH, config.SUMMARY_CHUNK_MAX_LENGTH - 1))
+        chunks = chunk_text(" ".join(partials), tokenizer)
+
+    while len(chunks) > 1:
+        # Summaries stopped shrinking enough (small SUMMARY_CHUNK_TOKENS, very long input): size
+        # each partial summary so that together they fit in one chunk, for as long as that helps
+        share = max(8, config.SUMMARY_CHUNK_TOKENS // len(chunks) - 2)
+        report["last_round_max_length"] = share
+        partials = _map_round(summarizer, chunks, report, share, min(config.SUMMARY_CHUNK_MIN_LENGTH, share // 2))
+        reduced = chunk_text(" ".join(partials), tokenizer)
+        if len(reduced) >= len(chunks):
+            print(f"⚠️ Long-document summary still {len(reduced)} chunks after {report['reduce_rounds']} "
+                  f"rounds; summarizing the first and leaving out the rest")
+            report["truncated"] = True
+            reduced = reduced[:1]
+        chunks = reduced
+
+    # Text that fit in one chunk is summarized as-is (keeps its line breaks)
+    final_text = chunks[0][0] if chunks and report["reduce_rounds"] else text
+    final_start = time.perf_counter()
+    if on_token is not None and hasattr(summarizer, "model"):
+        summary = _stream_final(summarizer, final_text, max_length, min_length, on_token)
+    else:
+        summary = summarizer(final_text, max_length=max_length, min_length=min_length,
+                             do_sample=False, truncation=True)[0]["summary_text"].strip()
+        if on_token is not None:
+            on_token(summary)
+    report["final_seconds"] = round(time.perf_counter() - final_start, 3)
+    report["total_seconds"] = round(time.perf_counter() - start, 3)
+    if report["chunks"]:
+        print(f"[INFO] Long-document summary: {len(report['chunks'])} chunk(s), "
+              f"{report['reduce_rounds']} round(s), {report['total_seconds']:.2f}s; per chunk: "
+              + ", ".join(f"{c['tokens']}tok={c['seconds']:.2f}s" for c in report["chunks"]))
+    return summary, report
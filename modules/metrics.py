@@ -0,0 +1,163 @@
+"""
+In-process counters and latency histograms, exposed in the Prometheus text format by /metrics.
+
+    metrics.observe("fir_stage_seconds", 0.42, stage="simplified")
+    with metrics.timed("fir_backend_seconds", backend="gemini"):
+        ...
+
+Recording is a dict lookup and a bisect under a lock, cheap enough to leave on.
+Values that already live elsewhere (queue depth, cache counters, model load times) are
+read at scrape time through register_collector() instead of being recorded twice.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+import config
+
+# Seconds; covers fast local stages up to slow OCR / model calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_meta = {}        # name -> (type, help)
+_counters = {}    # name -> {label items: value}
+_histograms = {}  # name -> {label items: [bucket counts..., +Inf count, sum]}
+_buckets = {}     # name -> bucket bounds
+_collectors = []  # (name, type, help, func) evaluated on scrape
+
+
+def describe(name, kind, help_text, buckets=None):
+    _meta[name] = (kind, help_text)
+    if kind == "histogram":
+        _buckets[name] = tuple(buckets or DEFAULT_BUCKETS)
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def inc(name, amount=1, **labels):
+    if not config.METRICS_ENABLED:
+        return
+    key = _key(labels)
+    with _lock:
+        series = _counters.setdefault(name, {})
+        series[key] = series.get(key, 0) + amount
+
+
+def observe(name, seconds, **labels):
+    if not config.METRICS_ENABLED:
+        return
+    bounds = _buckets.get(name, DEFAULT_BUCKETS)
+    key = _key(labels)
+    index = bisect.bisect_left(bounds, seconds)
+    with _lock:
+        series = _histograms.setdefault(name, {})
+        values = series.get(key)
+        if values is None:
+            values = series[key] = [0] * (len(bounds) + 2)
+        values[index] += 1
+        values[-1] += seconds
+
+
+@contextmanager
+def timed(name, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def counter_values(name):
+    """
+    Current values of a counter: {labels dict as tuple of (key, value) pairs: value}.
+    """
+    with _lock:
+        return dict(_counters.get(name, {}))
+
+
+def register_collector(name, kind, help_text, func):
+    """
+    func() returns {labels dict as tuple of (key, value) pairs: value}, read on every scrape.
+    """
+    _collectors.append((name, kind, help_text, func))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(items, extra=()):
+    items = tuple(items) + tuple(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4).
+    """
+    with _lock:
+        counters = {n: dict(s) for n, s in _counters.items()}
+        histograms = {n: {k: list(v) for k, v in s.items()} for n, s in _histograms.items()}
+
+    lines = []
+    for name in sorted(counters):
+        kind, help_text = _meta.get(name, ("counter", ""))
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for key, value in sorted(counters[name].items()):
+            lines.append(f"{name}{_labels(key)} {_number(value)}")
+
+    for name in sorted(histograms):
+        _, help_text = _meta.get(name, ("histogram", ""))
+        bounds = _buckets.get(name, DEFAULT_BUCKETS)
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for key, values in sorted(histograms[name].items()):
+            cumulative = 0
+            for bound, count in zip(bounds + (float("inf"),), values[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(key)} {_number(values[-1])}")
+            lines.append(f"{name}_count{_labels(key)} {cumulative}")
+
+    for name, kind, help_text, func in _collectors:
+        try:
+            series = func()
+        except Exception as e:
+            print(f"⚠️ metrics collector {name} failed:", e)
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for key, value in sorted(series.items()):
+            if value is not None:
+                lines.append(f"{name}{_labels(key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+describe("fir_stage_seconds", "histogram", "Time spent in each FIR pipeline stage.")
+describe("fir_stage_errors_total", "counter", "Pipeline stages that raised and used their fallback.")
+describe("fir_backend_seconds", "histogram",
+         "Time spent in external services and models (gemini, bart, translate, gtts).")
+describe("fir_gemini_requests_total", "counter",
+         "Gemini requests: call (sent upstream), merged (joined an identical call in flight), stream, "
+         "deadline (budget ran out).")
+describe("fir_first_content_seconds", "histogram",
+         "Time from upload to the first content (extracted text or simplified-text token) sent to the browser.")
+describe("fir_simplify_fallbacks_total", "counter", "Simplifications that fell back from Gemini, by reason.")
+describe("fir_requests_total", "counter", "FIR uploads by entry point, file type and language.")
+describe("http_requests_total", "counter", "HTTP requests by endpoint and status code.")
+describe("http_request_seconds", "histogram", "HTTP request latency by endpoint.")
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import tempfile
+import time
+
+import joblib
+
+# Bump when the bundle layout changes; older readers refuse newer bundles.
+FORMAT_VERSION = 1
+
+
+def feature_hash(vectorizer):
+    """
+    Fingerprint of the feature space: vocabulary + idf for TF-IDF, the parameters for
+    stateless vectorizers. Two bundles with the same hash produce identical feature matrices.
+    """
+    digest = hashlib.sha256(type(vectorizer).__name__.encode())
+    vocabulary = getattr(vectorizer, "vocabulary_", None)
+    if vocabulary is not None:
+        for term, index in sorted(vocabulary.items()):
+            digest.update(f"{term}\0{index}\n".encode("utf-8"))
+        idf = getattr(vectorizer, "idf_", None)
+        if idf is not None:
+            digest.update(idf.tobytes())
+    else:
+        digest.update(repr(sorted(vectorizer.get_params().items())).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_bundle(path, vectorizer, crime_type_model, severity_model, metadata=None):
+    """
+    Writes vectorizer, both models and metadata as one file. The file is written next to
+    the target and renamed over it, so a reader never sees a half-written bundle.
+    Uncompressed on purpose: only uncompressed joblib files can be memory-mapped.
+    """
+    fhash = feature_hash(vectorizer)
+    trained_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "version": f"{trained_at.replace(':', '').replace('-', '')}-{fhash[:8]}",
+        "trained_at": trained_at,
+        "feature_hash": fhash,
+        **(metadata or {}),
+    }
+    bundle = {
+        "metadata": meta,
+        "vectorizer": vectorizer,
+        "crime_type_model": crime_type_model,
+        "severity_model": severity_model,
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    os.close(fd)
+    try:
+        joblib.dump(bundle, tmp_path)
+        # mkstemp creates the file 0600; the renamed file must stay readable by other users
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return meta
+
+
+def load_bundle(path, mmap=True):
+    """
+    Loads a bundle. With mmap the numeric NumPy arrays joblib stores outside the pickle
+    (idf weights, coefficients, intercepts) are memory-mapped read-only, so they stay in the page
+    cache and are shared by every worker process that loads the same file. Everything else is
+    unpickled into each process: the vocabulary dict, class labels (object arrays) and anything a
+    model copies into its own structures when loaded, such as scikit-learn tree nodes.
+    """
+    bundle = joblib.load(path, mmap_mode="r" if mmap else None)
+    version = bundle.get("metadata", {}).get("format_version")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported model bundle format {version!r} in {path}")
+    return bundle
+
+
+def file_signature(path):
+    """
+    Changes whenever the file is rewritten or replaced: an os.replace gives a new inode
+    even when the mtime resolution hides the change.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
@@ -0,0 +1,120 @@
+import threading
+import time
+import traceback
+
+import config
+
+# name -> zero-argument function that builds the model
+_factories = {}
+# name -> loaded model (or None if loading failed)
+_models = {}
+# name -> {"load_seconds": ..., "rss_bytes": ..., "param_bytes": ..., "error": ...}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _current_rss():
+    """
+    Resident set size of this process in bytes (Linux), or None if unknown.
+    """
+    try:
+        import resource
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize()
+    except Exception:
+        return None
+
+
+def _param_bytes(model):
+    """
+    Size of the model weights in bytes for torch-backed pipelines/models.
+    """
+    inner = getattr(model, "model", model)
+    try:
+        return sum(p.numel() * p.element_size() for p in inner.parameters())
+    except Exception:
+        return None
+
+
+def register_model(name, factory):
+    """
+    Register a loader for a model. Nothing is loaded until get_model() is called.
+    """
+    with _lock:
+        _factories[name] = factory
+
+
+def get_model(name):
+    """
+    Returns the shared instance of a model, loading it on first use.
+    Returns None if the model could not be loaded (the failure is cached).
+    """
+    if name in _models:
+        return _models[name]
+
+    with _lock:
+        if name in _models:
+            return _models[name]
+        if name not in _factories:
+            raise KeyError(f"Unknown model: {name}")
+
+        rss_before = _current_rss()
+        start = time.perf_counter()
+        try:
+            model = _factories[name]()
+            error = None
+        except Exception as e:
+            traceback.print_exc()
+            model = None
+            error = str(e)
+        elapsed = time.perf_counter() - start
+        rss_after = _current_rss()
+
+        _stats[name] = {
+            "load_seconds": round(elapsed, 3),
+            "rss_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+            "param_bytes": _param_bytes(model) if model is not None else None,
+            "error": error,
+        }
+        _models[name] = model
+        print(f"[INFO] Model '{name}' loaded in {elapsed:.2f}s" if model is not None
+              else f"[ERROR] Model '{name}' failed to load: {error}")
+        return model
+
+
+def is_loaded(name):
+    return _models.get(name) is not None
+
+
+def warm_up(names=None):
+    """
+    Load the given models (all registered models by default) ahead of the first request.
+    Returns {name: True/False} telling which ones are available.
+    """
+    names = list(_factories) if names is None else names
+    return {name: get_model(name) is not None for name in names}
+
+
+def memory_report():
+    """
+    Per-model load status, load time and resident memory.
+    rss_bytes is the growth of process RSS while the model loaded;
+    param_bytes is the size of its weights.
+    """
+    report = {}
+    for name in _factories:
+        entry = {"loaded": is_loaded(name)}
+        entry.update(_stats.get(name, {}))
+        report[name] = entry
+    return report
+
+
+# ---- Built-in models ----
+def _load_summarizer():
+    from modules.inference_backends import load_summarizer
+    return load_summarizer(config.SUMMARIZER_BACKEND)
+
+
+SUMMARIZER = "summarizer"
+register_model(SUMMARIZER, _load_summarizer)
@@ -1,53 +1,358 @@
 import pytesseract
-from PIL import Image
+from PIL import Image, ImageOps
 import pdfplumber
+import io
+import multiprocessing
 import os
-import pytesseract
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import config
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 # Set Tesseract path (adjust for your OS)
 pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_PATH", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
 os.environ['TESSDATA_PREFIX'] = os.getenv("TESSDATA_PREFIX", r"C:\Program Files\Tesseract-OCR\tessdata")
 
-def extract_text_from_image(image_path):
+# ---- Image preprocessing before Tesseract ----
+def _otsu_threshold(gray):
+    """
+    Otsu's threshold from the grayscale histogram.
+    """
+    hist = gray.histogram()[:256]
+    total = sum(hist)
+    sum_all = sum(i * h for i, h in enumerate(hist))
+    sum_bg = weight_bg = 0
+    best, threshold = -1.0, 127
+    for i, h in enumerate(hist):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if between > best:
+            best, threshold = between, i
+    return threshold
+
+
+def _downscale(gray, dpi):
+    """
+    Scales down to OCR_TARGET_DPI when the source DPI is known, and never beyond OCR_MAX_SIDE pixels.
+    """
+    scale = 1.0
+    if dpi and dpi > config.OCR_TARGET_DPI:
+        scale = config.OCR_TARGET_DPI / dpi
+    longest = max(gray.size) * scale
+    if longest > config.OCR_MAX_SIDE:
+        scale *= config.OCR_MAX_SIDE / longest
+    if scale >= 1.0:
+        return gray
+    size = (max(1, int(gray.width * scale)), max(1, int(gray.height * scale)))
+    return gray.resize(size, Image.LANCZOS)
+
+
+def _crop_margins(binary, padding=10):
+    # getbbox() works on non-zero pixels, so look at the inverted (ink = white) image
+    bbox = ImageOps.invert(binary).getbbox()
+    if not bbox:
+        return binary
+    left, top, right, bottom = bbox
+    return binary.crop((max(0, left - padding), max(0, top - padding),
+                        min(binary.width, right + padding), min(binary.height, bottom + padding)))
+
+
+def _skew_angle(binary, max_angle=5.0, step=0.5):
+    """
+    Small-angle skew estimate: the rotation whose row-ink profile is the most peaked.
+    Runs on a thumbnail, so it costs a few milliseconds. Angles are tried from 0 outwards and
+    only a strictly better score moves away from 0, so a page without a clear skew is not rotated.
+    """
+    thumb = ImageOps.invert(binary)
+    thumb.thumbnail((800, 800))
+
+    def score(angle):
+        rotated = thumb.rotate(angle, resample=Image.NEAREST, expand=False) if angle else thumb
+        rows = np.asarray(rotated, dtype=np.float32).sum(axis=1)
+        return float(np.square(np.diff(rows)).sum())
+
+    best_angle, best_score = 0.0, score(0.0)
+    for k in range(1, int(max_angle / step) + 1):
+        for angle in (k * step, -k * step):
+            angle_score = score(angle)
+            if angle_score > best_score:
+                best_angle, best_score = angle, angle_score
+    return best_angle
+
+
+def _choose_psm(binary):
+    """
+    Tesseract page-segmentation mode from the page shape and ink density.
+    """
+    width, height = binary.size
+    ink = 1.0 - (binary.histogram()[255] / float(width * height))
+    if height and width / height > 8:
+        return 7   # a single text line
+    if ink < 0.01:
+        return 11  # sparse text scattered on the page
+    return 3       # fully automatic page segmentation
+
+
+def preprocess_image(image, dpi=None):
+    """
+    Prepares an image for Tesseract: grayscale, DPI-aware downscaling, binarization,
+    cropping of blank margins and deskew. Returns (image, psm, timings) where timings
+    maps each step to seconds.
+    """
+    timings = {}
+
+    def step(name, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    if dpi is None:
+        dpi = (image.info.get("dpi") or (None,))[0]
+    gray = step("grayscale", lambda img: ImageOps.exif_transpose(img).convert("L"), image)
+    gray = step("downscale", _downscale, gray, dpi)
+    threshold = step("threshold", _otsu_threshold, gray)
+    binary = step("binarize", lambda img: img.point(lambda v: 255 if v > threshold else 0), gray)
+    # Crop first so deskewing rotates as few pixels as possible
+    binary = step("crop", _crop_margins, binary)
+    angle = step("deskew_estimate", _skew_angle, binary) if np is not None else 0.0
+    if angle:
+        binary = step("deskew", lambda img: _crop_margins(
+            img.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=255)), binary)
+    psm = step("psm", _choose_psm, binary)
+    return binary, psm, timings
+
+
+def ocr_image(image, dpi=None, preprocess=True):
+    """
+    Runs Tesseract on a PIL image. Returns (text, timings).
+    """
+    timings = {}
+    psm = 3
+    if preprocess and config.OCR_PREPROCESS:
+        image, psm, timings = preprocess_image(image, dpi)
+    start = time.perf_counter()
+    text = pytesseract.image_to_string(image, lang='eng', config=f"--psm {psm}").strip()
+    timings["tesseract"] = time.perf_counter() - start
+    return text, timings
+
+
+def extract_text_from_image(source):
     try:
-        with Image.open(image_path) as image:
-            text = pytesseract.image_to_string(image, lang='eng').strip()
+        with Image.open(_readable(source)) as image:
+            text, timings = ocr_image(image)
+        print("[INFO] OCR timings: " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
         return text if text else "⚠️ No text detected in the image."
     except Exception as e:
         return f"❌ Error in OCR (image): {e}"
 
-def extract_text_from_pdf(pdf_path):
+# ---- Sources: a file path, bytes, or a binary file object (e.g. an upload kept in memory) ----
+def _is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+
+def _readable(source):
+    """
+    Something Image.open / pdfplumber.open can read from the start: the path itself,
+    bytes wrapped in a BytesIO, or the file object rewound.
+    """
+    if _is_path(source):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+@contextmanager
+def _on_disk(source, suffix):
+    """
+    A path for worker processes to open. In-memory sources are written to a temporary
+    file for the duration, since file objects cannot be shared with the pool.
+    """
+    if _is_path(source):
+        yield source
+        return
+    fd, path = tempfile.mkstemp(suffix=suffix)
     try:
-        text = ""
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+        with os.fdopen(fd, "wb") as out:
+            shutil.copyfileobj(_readable(source), out)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+# ---- PDF extraction, one page per task on a process pool ----
+_page_pool = None
+_page_pool_lock = threading.Lock()
+# Worker-process LRU of open PDFs (path -> (mtime, pdf)), so pages of uploads processed at
+# the same time don't make a worker re-parse each file whenever it switches between them
+_worker_pdf = OrderedDict()
+_WORKER_PDFS = 4
+
+
+def _get_page_pool():
+    """
+    The page pool. Workers are started from a fork server (spawn where there is none) rather than
+    forked from the web process, whose other threads may hold locks and which may have BART loaded;
+    the fork server only preloads this module.
+    """
+    global _page_pool
+    if _page_pool is None:
+        with _page_pool_lock:
+            if _page_pool is None:
+                if "forkserver" in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context("forkserver")
+                    context.set_forkserver_preload([__name__])
                 else:
-                    # Fallback for scanned PDFs
-                    img = page.to_image()
-                    text += pytesseract.image_to_string(img.original, lang='eng').strip() + "\n"
-        return text.strip() if text.strip() else "⚠️ No text found in PDF pages."
+                    context = multiprocessing.get_context("spawn")
+                _page_pool = ProcessPoolExecutor(max_workers=config.OCR_WORKERS, mp_context=context)
+    return _page_pool
+
+
+def _open_pdf_cached(pdf_path):
+    mtime = os.path.getmtime(pdf_path)
+    cached = _worker_pdf.get(pdf_path)
+    if cached is not None and cached[0] == mtime:
+        _worker_pdf.move_to_end(pdf_path)
+        return cached[1]
+    if cached is not None:
+        del _worker_pdf[pdf_path]
+        cached[1].close()
+    # Parse from memory so the upload file isn't held open (it is deleted after processing)
+    with open(pdf_path, "rb") as f:
+        pdf = pdfplumber.open(io.BytesIO(f.read()))
+    _worker_pdf[pdf_path] = (mtime, pdf)
+    while len(_worker_pdf) > _WORKER_PDFS:
+        _, (_, old) = _worker_pdf.popitem(last=False)
+        old.close()
+    return pdf
+
+
+def _page_text(page):
+    """
+    Text of one page; scanned pages (no text layer) go through Tesseract.
+    """
+    try:
+        page_text = page.extract_text()
+        if page_text:
+            return page_text
+        # Fallback for scanned PDFs: rasterize straight at the resolution Tesseract wants
+        img = page.to_image(resolution=config.OCR_TARGET_DPI)
+        text, _timings = ocr_image(img.original, dpi=config.OCR_TARGET_DPI)
+        return text
+    finally:
+        # Drop the parsed page objects, keep the document open for the next page
+        page.close()
+
+
+def _extract_pdf_page(pdf_path, index):
+    return _page_text(_open_pdf_cached(pdf_path).pages[index])
+
+
+def count_pdf_pages(source):
+    with pdfplumber.open(_readable(source)) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(source, max_pages=None, stop=None, workers=None):
+    """
+    Yields (page_number, text) in page order as soon as each page is ready.
+    source is a path, bytes or a binary file object.
+    Pages are extracted in parallel on a process pool, at most 2 x workers in flight.
+    max_pages limits how many pages are read; stop(page_number, text) returning True
+    ends extraction early (closing the generator does the same).
+    """
+    total = count_pdf_pages(source)
+    if max_pages is not None:
+        total = min(total, max_pages)
+    workers = workers or config.OCR_WORKERS
+
+    # Single page or single worker: no point paying for inter-process transfer
+    if total <= 1 or workers <= 1:
+        with pdfplumber.open(_readable(source)) as pdf:
+            for i in range(total):
+                text = _page_text(pdf.pages[i])
+                yield i + 1, text
+                if stop is not None and stop(i + 1, text):
+                    return
+        return
+
+    with _on_disk(source, ".pdf") as pdf_path:
+        yield from _iter_pages_parallel(pdf_path, total, stop, workers)
+
+
+def _iter_pages_parallel(pdf_path, total, stop, workers):
+    pool = _get_page_pool()
+    window = 2 * workers
+    futures = {}
+    next_submit = 0
+    try:
+        for i in range(total):
+            while next_submit < total and next_submit < i + window:
+                futures[next_submit] = pool.submit(_extract_pdf_page, pdf_path, next_submit)
+                next_submit += 1
+            text = futures.pop(i).result()
+            yield i + 1, text
+            if stop is not None and stop(i + 1, text):
+                return
+    finally:
+        for future in futures.values():
+            future.cancel()
+
+
+def extract_text_from_pdf(source, max_pages=None, stop=None):
+    try:
+        pages = [text.strip() for _, text in iter_pdf_pages(source, max_pages=max_pages, stop=stop)]
+        text = "\n".join(p for p in pages if p)
+        return text if text else "⚠️ No text found in PDF pages."
     except Exception as e:
         return f"❌ Error in OCR (PDF): {e}"
 
-def extract_text_from_txt(txt_path):
+def extract_text_from_txt(source):
     try:
-        with open(txt_path, 'r', encoding='utf-8') as f:
-            text = f.read().strip()
+        if _is_path(source):
+            with open(source, 'r', encoding='utf-8') as f:
+                text = f.read().strip()
+        else:
+            data = _readable(source).read()
+            text = data.decode('utf-8').strip()
         return text if text else "⚠️ Text file is empty."
     except Exception as e:
         return f"❌ Error reading text file: {e}"
 
-def extract_text(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+def extract_text(source, filename=None):
+    """
+    Text of an uploaded file. source is a path, bytes or a binary file object;
+    filename (default: the path) decides the file type.
+    """
+    name = filename or (os.fspath(source) if _is_path(source) else "")
+    ext = os.path.splitext(name)[1].lower()
     if ext in [".jpg", ".jpeg", ".png"]:
-        return extract_text_from_image(file_path)
+        return extract_text_from_image(source)
     elif ext == ".pdf":
-        return extract_text_from_pdf(file_path)
+        return extract_text_from_pdf(source, max_pages=config.OCR_MAX_PAGES or None)
     elif ext == ".txt":
-        return extract_text_from_txt(file_path)
-    return "❌ Unsupported file format"
\ No newline at end of file
+        return extract_text_from_txt(source)
+    return "❌ Unsupported file format"
@@ -1,11 +1,154 @@
-def predict_outcome(fir_text):
-    text = fir_text.lower()
-    if "murder" in text or "assault" in text:
-        return "High chance of arrest (serious crime)"
-    elif "fraud" in text or "cheating" in text:
-        return "Investigation may take months (financial crime)"
-    elif "theft" in text or "burglary" in text:
-        return "Likely recovery depends on police follow-up"
-    elif "cyber" in text or "atm card" in text:
-        return "Cyber cell involvement needed"
-    return "Outcome unclear – depends on investigation"
\ No newline at end of file
+import json
+import os
+import re
+import threading
+
+# Rules file: {"default_outcome": ..., "rules": [{"id", "priority", "keywords", "outcome", "jurisdiction"?}]}
+# Keywords match whole words, case-insensitively; a trailing * also matches longer words
+# ("murder*" -> murdered, murderer) and a leading * words that end with or contain it
+# ("*fraud*" -> defrauded, cyberfraud). Higher priority wins.
+OUTCOME_RULES_PATH = os.getenv("OUTCOME_RULES_PATH", os.path.join(os.path.dirname(__file__), "outcome_rules.json"))
+
+# Swapped as a whole on reload so readers never see a half-built rule set
+_state = {"mtime": None, "compiled": None}
+_lock = threading.Lock()
+
+
+def _normalize(keyword):
+    return " ".join(keyword.lower().split())
+
+
+def _keyword_pattern(keyword):
+    prefix = keyword.endswith("*")
+    infix = keyword.startswith("*")
+    words = _normalize(keyword.strip("*")).split(" ")
+    body = r"\s+".join(re.escape(w) for w in words)
+    return (r"\w*" if infix else "") + body + (r"\w*" if prefix else r"\b")
+
+
+def compile_rules(data):
+    """
+    Compiles every keyword of every rule into one alternation regex, so the text is
+    scanned once however many rules there are. The alternation sits in a zero-width lookahead
+    at each word start, so keywords that overlap ("atm card" / "card fraud") all match.
+    """
+    rules = sorted(data.get("rules", []), key=lambda r: -r.get("priority", 0))
+    exact = {}     # keyword -> [rule index]
+    prefixes = []  # (prefix, [rule index])
+    infixes = {}   # "*core" / "*core*" -> [rule index]
+    for index, rule in enumerate(rules):
+        for keyword in rule.get("keywords", []):
+            if keyword.startswith("*"):
+                key = "*" + _normalize(keyword.strip("*")) + ("*" if keyword.endswith("*") else "")
+                infixes.setdefault(key, []).append(index)
+            elif keyword.endswith("*"):
+                key = _normalize(keyword.rstrip("*"))
+                for p, owners in prefixes:
+                    if p == key:
+                        owners.append(index)
+                        break
+                else:
+                    prefixes.append((key, [index]))
+            else:
+                exact.setdefault(_normalize(keyword), []).append(index)
+
+    keywords = list(exact) + [p + "*" for p, _ in prefixes] + list(infixes)
+    # Longest first so "atm card" wins over "atm"
+    keywords.sort(key=len, reverse=True)
+    pattern = re.compile(r"\b(?=(" + "|".join(_keyword_pattern(k) for k in keywords) + "))", re.IGNORECASE) \
+        if keywords else None
+    # Longest prefix first when mapping a matched word back to its keyword
+    prefixes.sort(key=lambda p: len(p[0]), reverse=True)
+    return {
+        "rules": rules,
+        "exact": exact,
+        "prefixes": prefixes,
+        "infixes": infixes,
+        "pattern": pattern,
+        "default_outcome": data.get("default_outcome", "Outcome unclear – depends on investigation"),
+    }
+
+
+def _get_compiled():
+    """
+    The compiled rules, rebuilt only when the rules file changes.
+    """
+    mtime = os.path.getmtime(OUTCOME_RULES_PATH)
+    if mtime != _state["mtime"]:
+        with _lock:
+            if mtime != _state["mtime"]:
+                with open(OUTCOME_RULES_PATH, "r", encoding="utf-8") as f:
+                    _state["compiled"] = compile_rules(json.load(f))
+                _state["mtime"] = mtime
+    return _state["compiled"]
+
+
+def _owners(compiled, matched):
+    """
+    (keyword, rule indexes) for every keyword the matched text starts with (or, for *keywords,
+    ends with / contains): the regex reports only one keyword per match, but "atm card" must
+    also fire rules on "atm" / "atm*", and "cyberfraud" rules on both "*cyber*" and "*fraud*".
+    """
+    key = _normalize(matched)
+    found = []
+    words = key.split(" ")
+    for n in range(len(words), 0, -1):
+        candidate = " ".join(words[:n])
+        if candidate in compiled["exact"]:
+            found.append((candidate, compiled["exact"][candidate]))
+    for prefix, owners in compiled["prefixes"]:
+        if key.startswith(prefix):
+            found.append((prefix + "*", owners))
+    for keyword, owners in compiled["infixes"].items():
+        core = keyword.strip("*")
+        if (core in key) if keyword.endswith("*") else key.endswith(core):
+            found.append((keyword, owners))
+    return found
+
+
+def evaluate_rules(fir_text, jurisdiction=None, compiled=None):
+    """
+    Every rule that fires on the text, highest priority first, each with its evidence:
+    [{"id", "priority", "outcome", "evidence": [{"keyword", "text", "start", "end"}]}]
+    Rules tagged with a jurisdiction only apply when that jurisdiction is requested.
+    """
+    compiled = compiled or _get_compiled()
+    if compiled["pattern"] is None or not fir_text:
+        return []
+    rules = compiled["rules"]
+    evidence = {}
+    for match in compiled["pattern"].finditer(fir_text):
+        for keyword, owners in _owners(compiled, match.group(1)):
+            for index in owners:
+                evidence.setdefault(index, []).append(
+                    {"keyword": keyword, "text": match.group(1), "start": match.start(1), "end": match.end(1)})
+
+    fired = []
+    for index in sorted(evidence):
+        rule = rules[index]
+        if rule.get("jurisdiction") not in (None, jurisdiction):
+            continue
+        fired.append({
+            "id": rule.get("id", str(index)),
+            "priority": rule.get("priority", 0),
+            "outcome": rule["outcome"],
+            "evidence": evidence[index],
+        })
+    return fired
+
+
+def evaluate_rules_batch(texts, jurisdiction=None):
+    compiled = _get_compiled()
+    return [evaluate_rules(t, jurisdiction, compiled) for t in texts]
+
+
+def predict_outcome(fir_text, jurisdiction=None):
+    fired = evaluate_rules(fir_text, jurisdiction)
+    if fired:
+        return fired[0]["outcome"]
+    return _get_compiled()["default_outcome"]
+
+
+def predict_outcome_batch(texts, jurisdiction=None):
+    default = _get_compiled()["default_outcome"]
+    return [fired[0]["outcome"] if fired else default for fired in evaluate_rules_batch(texts, jurisdiction)]
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+import threading
+import time
+import traceback
+import unicodedata
+from collections import OrderedDict
+
+import config
+from database import models
+
+# In-process LRU tier: key -> (value, created_at)
+_memory = OrderedDict()
+_lock = threading.Lock()
+_puts_since_evict = 0
+# False once the database can't be opened or isn't a usable cache database: memory tier only
+_disk_ok = True
+# After a transient error (e.g. "database is locked") the SQLite tier is skipped until this time
+_disk_retry_at = 0.0
+_disk_backoff = 0.0
+
+# stage -> {"memory_hits", "disk_hits", "misses", "puts"}
+_counters = {}
+_evictions = {"memory": 0, "disk": 0}
+
+# Evict old/excess SQLite rows after this many writes
+_EVICT_EVERY = 100
+# Seconds the SQLite tier is skipped after a transient error, doubling up to the maximum
+_BACKOFF_MIN = 1.0
+_BACKOFF_MAX = 60.0
+
+
+def normalize_text(text):
+    """
+    Normalizes text so that trivially different copies (whitespace, Unicode form) share a key.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(stage, text, lang="en"):
+    digest = hashlib.sha256()
+    for part in (stage, lang or "", normalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _count(stage, field):
+    counters = _counters.setdefault(stage, {"memory_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0})
+    counters[field] += 1
+
+
+def _disk(func, *args):
+    """
+    Runs a database call for the SQLite tier, which is best effort: a broken database must not
+    break the pipeline. If the database can't be opened or is not a cache database, the tier is
+    switched off; operational errors (locked, busy, I/O) skip it for a while with growing backoff.
+    """
+    global _disk_ok, _disk_retry_at, _disk_backoff
+    if not _disk_ok or time.time() < _disk_retry_at:
+        return None
+    try:
+        models.get_connection()
+    except Exception:
+        traceback.print_exc()
+        print("⚠️ Result cache database unavailable, continuing with memory cache only.")
+        _disk_ok = False
+        return None
+    try:
+        result = func(*args)
+    except sqlite3.OperationalError as e:
+        with _lock:
+            _disk_backoff = min(_BACKOFF_MAX, _disk_backoff * 2 or _BACKOFF_MIN)
+            _disk_retry_at = time.time() + _disk_backoff
+        print(f"⚠️ Result cache database error ({e}); memory cache only for {_disk_backoff:.0f}s.")
+        return None
+    except sqlite3.DatabaseError:
+        traceback.print_exc()
+        print("⚠️ Result cache database is corrupt, continuing with memory cache only.")
+        _disk_ok = False
+        return None
+    if _disk_backoff:
+        with _lock:
+            _disk_backoff = 0.0
+    return result
+
+
+def _remember(key, value, created_at):
+    _memory[key] = (value, created_at)
+    _memory.move_to_end(key)
+    while len(_memory) > config.RESULT_CACHE_MEMORY_ITEMS:
+        _memory.popitem(last=False)
+        _evictions["memory"] += 1
+
+
+def get(stage, text, lang="en"):
+    """
+    Returns the cached result for (stage, text, lang) or None.
+    """
+    if not config.RESULT_CACHE_ENABLED:
+        return None
+    key = cache_key(stage, text, lang)
+    max_age = config.RESULT_CACHE_MAX_AGE
+
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            if time.time() - entry[1] <= max_age:
+                _memory.move_to_end(key)
+                _count(stage, "memory_hits")
+                return entry[0]
+            del _memory[key]
+
+    row = _disk(models.cache_get, key, max_age)
+    with _lock:
+        if row is None:
+            _count(stage, "misses")
+            return None
+        _remember(key, row[0], row[1])
+        _count(stage, "disk_hits")
+    return row[0]
+
+
+def put(stage, text, value, lang="en"):
+    """
+    Stores a successful result. Error / warning messages are never cached.
+    """
+    global _puts_since_evict
+    if not config.RESULT_CACHE_ENABLED or not value or value.startswith(("❌", "⚠️")):
+        return
+    key = cache_key(stage, text, lang)
+
+    with _lock:
+        _remember(key, value, time.time())
+        _count(stage, "puts")
+        _puts_since_evict += 1
+        evict = _puts_since_evict >= _EVICT_EVERY
+        if evict:
+            _puts_since_evict = 0
+
+    _disk(models.cache_put, key, stage, lang or "", value)
+    if evict:
+        deleted = _disk(models.cache_evict, config.RESULT_CACHE_MAX_ROWS, config.RESULT_CACHE_MAX_AGE)
+        with _lock:
+            _evictions["disk"] += deleted or 0
+
+
+def stats():
+    """
+    Hit/miss counters per stage plus tier sizes.
+    """
+    with _lock:
+        per_stage = {}
+        for stage, c in _counters.items():
+            lookups = c["memory_hits"] + c["disk_hits"] + c["misses"]
+            per_stage[stage] = dict(c, hit_rate=round((lookups - c["misses"]) / lookups, 3) if lookups else None)
+        return {
+            "enabled": config.RESULT_CACHE_ENABLED,
+            "memory_items": len(_memory),
+            "disk_available": _disk_ok and time.time() >= _disk_retry_at,
+            "evictions": dict(_evictions),
+            "stages": per_stage,
+        }
+
+
+def clear_memory():
+    with _lock:
+        _memory.clear()
@@ -0,0 +1,85 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import config
+from modules import metrics
+
+
+class Stage:
+    """
+    One step of a pipeline.
+    func is called with keyword arguments named after its deps (inputs or earlier stages).
+    If func raises, the stage result becomes `fallback` and later stages still run.
+    """
+    def __init__(self, name, func, deps=(), fallback=None, error_label=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.fallback = fallback
+        self.error_label = error_label or f"⚠️ {name} error:"
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=config.PIPELINE_WORKERS,
+                                           thread_name_prefix="stage")
+    return _pool
+
+
+def _run_one(stage, kwargs):
+    start = time.perf_counter()
+    try:
+        value = stage.func(**kwargs)
+    except Exception as e:
+        print(stage.error_label, e)
+        metrics.inc("fir_stage_errors_total", stage=stage.name)
+        value = stage.fallback
+    seconds = time.perf_counter() - start
+    metrics.observe("fir_stage_seconds", seconds, stage=stage.name)
+    return value, seconds
+
+
+def run_stages(stages, inputs=None, on_stage_done=None):
+    """
+    Runs stages on the shared thread pool, starting each one as soon as its deps are done.
+    on_stage_done(name, value, seconds) is called from the calling thread as each stage finishes.
+    Returns (results, timings): results maps input/stage names to values,
+    timings maps stage names to seconds spent in the stage.
+    """
+    results = dict(inputs or {})
+    timings = {}
+    pending = {s.name: s for s in stages}
+
+    for s in stages:
+        for dep in s.deps:
+            if dep not in pending and dep not in results:
+                raise ValueError(f"Stage '{s.name}' depends on unknown '{dep}'")
+
+    pool = _get_pool()
+    running = {}
+
+    while pending or running:
+        for name in [n for n, s in pending.items() if all(d in results for d in s.deps)]:
+            stage = pending.pop(name)
+            kwargs = {d: results[d] for d in stage.deps}
+            running[pool.submit(_run_one, stage, kwargs)] = name
+
+        if not running:
+            raise ValueError(f"Dependency cycle between stages: {sorted(pending)}")
+
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done:
+            name = running.pop(future)
+            results[name], timings[name] = future.result()
+            if on_stage_done is not None:
+                on_stage_done(name, results[name], timings[name])
+
+    return results, timings
@@ -0,0 +1,84 @@
+import re
+from collections import deque
+
+# Words, plus each punctuation mark as its own token ("u/s" -> "u", "/", "s")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _tokens(text):
+    return [t.lower() for t in _TOKEN.findall(text)]
+
+
+class TermMatcher:
+    """
+    Aho-Corasick automaton over a set of terms, with words as the alphabet.
+    Matching is case-insensitive, only whole words match ("bail" does not match
+    inside "bailiff") and the text is scanned once, whatever the number of terms.
+    """
+    def __init__(self, terms):
+        # Node i: _goto[i] maps a token to the next node, _fail[i] is the fallback node,
+        # _out[i] lists (term, token_count) pairs that end at this node.
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        for term in terms:
+            self._add(term)
+        self._build_failure_links()
+
+    def _add(self, term):
+        tokens = _tokens(term)
+        if not tokens:
+            return
+        node = 0
+        for tok in tokens:
+            nxt = self._goto[node].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+                self._goto[node][tok] = nxt
+            node = nxt
+        self._out[node].append((term, len(tokens)))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for tok, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and tok not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(tok, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text):
+        """
+        Every occurrence of every term: list of (start, end, term) character offsets, possibly overlapping.
+        """
+        spans = [(m.start(), m.end(), m.group().lower()) for m in _TOKEN.finditer(text)]
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        node = 0
+        for j, (_, end, tok) in enumerate(spans):
+            while node and tok not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(tok, 0)
+            for term, length in out[node]:
+                matches.append((spans[j - length + 1][0], end, term))
+        return matches
+
+    def find(self, text):
+        """
+        Non-overlapping matches for highlighting: leftmost first, longest term wins.
+        """
+        result = []
+        last_end = 0
+        for start, end, term in sorted(self.find_all(text), key=lambda m: (m[0], -(m[1] - m[0]))):
+            if start >= last_end:
+                result.append((start, end, term))
+                last_end = end
+        return result
@@ -1,7 +1,21 @@
-from langdetect import detect
-from googletrans import Translator
+import hashlib
+import re
+import threading
+import traceback
+from collections import OrderedDict
+
+import config
+from database import models
+from modules import metrics, result_cache
+
+try:
+    from langdetect import detect
+except ImportError:
+    detect = None
+
+# Sentence boundaries (kept so the translation can be put back together with the same spacing)
+_SEGMENT_SPLIT = re.compile(r'((?<=[.!?।])\s+|\n+)')
 
-google_translator = Translator()
 
 def detect_language(text):
     try:
@@ -9,12 +23,168 @@ def detect_language(text):
     except:
         return "en"
 
+
+# ---- Backends ----
+class GoogleBackend:
+    """
+    googletrans. All sentences go out as one newline-joined request.
+    """
+    def __init__(self):
+        from googletrans import Translator
+        self.translator = Translator()
+
+    def translate_batch(self, sentences, dest):
+        joined = self.translator.translate("\n".join(sentences), dest=dest).text
+        parts = joined.split("\n")
+        if len(parts) == len(sentences):
+            return [p.strip() for p in parts]
+        # The service merged or split lines; fall back to one result per sentence
+        return [t.text for t in self.translator.translate(list(sentences), dest=dest)]
+
+
+class LocalBackend:
+    """
+    Offline stand-in: deterministic "[lang] sentence" output, for tests and benchmarks.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def translate_batch(self, sentences, dest):
+        self.calls += 1
+        return [f"[{dest}] {s}" for s in sentences]
+
+
+BACKENDS = {"google": GoogleBackend, "local": LocalBackend}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = BACKENDS[config.TRANSLATION_BACKEND]()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Replaces the translation backend (any object with translate_batch(sentences, dest)).
+    """
+    global _backend
+    _backend = backend
+
+
+# ---- Translation memory ----
+# In-process front for the SQLite translation_memory table: (hash, lang) -> target
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _sentence_hash(sentence):
+    return hashlib.sha256(" ".join(sentence.split()).encode("utf-8")).hexdigest()
+
+
+def _memory_get(keys, lang):
+    found = {}
+    with _memory_lock:
+        for key in keys:
+            value = _memory.get((key, lang))
+            if value is not None:
+                _memory.move_to_end((key, lang))
+                found[key] = value
+    return found
+
+
+def _memory_put(entries, lang):
+    with _memory_lock:
+        for key, target in entries:
+            _memory[(key, lang)] = target
+            _memory.move_to_end((key, lang))
+        while len(_memory) > config.TRANSLATION_MEMORY_ITEMS:
+            _memory.popitem(last=False)
+
+
+def _lookup(keys, lang):
+    found = _memory_get(keys, lang)
+    missing = [k for k in keys if k not in found]
+    if missing:
+        try:
+            stored = models.tm_get_many(missing, lang)
+        except Exception:
+            traceback.print_exc()
+            stored = {}
+        _memory_put(stored.items(), lang)
+        found.update(stored)
+    return found
+
+
+def _store(entries, lang):
+    """
+    entries: list of (hash, source, target)
+    """
+    _memory_put([(h, tgt) for h, _, tgt in entries], lang)
+    try:
+        models.tm_put_many(entries, lang)
+    except Exception:
+        traceback.print_exc()
+
+
+def split_segments(text):
+    """
+    Splits text into sentences and the separators between them: [sentence, sep, sentence, ...].
+    """
+    return [s for s in _SEGMENT_SPLIT.split(text) if s]
+
+
+def _is_sentence(segment):
+    return bool(segment.strip())
+
+
+def translate_many(texts, target_lang):
+    """
+    Translates several texts with one backend call: sentences already in the translation
+    memory are reused and only the missing ones are sent.
+    """
+    if target_lang == "en":
+        return list(texts)
+
+    segmented = [split_segments(t) for t in texts]
+    sentence_keys = {}
+    for segments in segmented:
+        for seg in segments:
+            if _is_sentence(seg) and seg not in sentence_keys:
+                sentence_keys[seg] = _sentence_hash(seg)
+
+    known = _lookup(list(set(sentence_keys.values())), target_lang)
+    misses = {}
+    for sentence, key in sentence_keys.items():
+        if key not in known and key not in misses:
+            misses[key] = sentence
+
+    if misses:
+        sources = list(misses.values())
+        with metrics.timed("fir_backend_seconds", backend="translate"):
+            targets = get_backend().translate_batch(sources, target_lang)
+        new_entries = list(zip(misses.keys(), sources, targets))
+        _store(new_entries, target_lang)
+        known.update((h, tgt) for h, _, tgt in new_entries)
+
+    return ["".join(known[sentence_keys[seg]] if _is_sentence(seg) else seg for seg in segments)
+            for segments in segmented]
+
+
 def translate_to_language(text, target_lang):
     if target_lang == "en":
         return text
+    cached = result_cache.get("translate", text, target_lang)
+    if cached is not None:
+        return cached
     try:
-        translated = google_translator.translate(text, dest=target_lang)
-        return translated.text
+        translated = translate_many([text], target_lang)[0]
+        result_cache.put("translate", text, translated, target_lang)
+        return translated
     except Exception as e:
         print(f"❌ Google Translate error: {e}")
-        return "❌ Translation failed. Please try again later."
\ No newline at end of file
+        return "❌ Translation failed. Please try again later."
@@ -1,25 +1,170 @@
-from gtts import gTTS
+import io
 import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def text_to_speech(text, lang='en', filename='output.mp3'):
+import config
+from modules import audio_store, metrics
+
+try:
+    from gtts import gTTS
+    GTTS_AVAILABLE = True
+except ImportError:
+    GTTS_AVAILABLE = False
+
+# Sentence ends, including the Devanagari danda used by Hindi / Marathi translations
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?।])\s+|\n+')
+
+
+# ---- Backends: synthesize(text, lang) -> MP3 bytes ----
+class GTTSBackend:
     """
-    Converts text to speech using gTTS and saves it in static/ folder.
-    Returns the saved filename (with path).
+    gTTS (Google Translate's speech endpoint). One network round trip per ~100 characters.
+    """
+    def __init__(self):
+        if not GTTS_AVAILABLE:
+            raise RuntimeError("gTTS is not installed (set TTS_BACKEND=local to run offline)")
+
+    def synthesize(self, text, lang):
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buf)
+        return buf.getvalue()
+
+
+class LocalBackend:
+    """
+    Offline stand-in: valid, silent MPEG-1 Layer III audio lasting about as long as the text
+    would take to read aloud, after `delay` seconds.
+    """
+    # 32 kbit/s, 44.1 kHz, mono: 104-byte frames of 1152 samples (~26 ms)
+    FRAME = b"\xff\xfb\x10\xc4" + bytes(100)
+    CHARS_PER_SECOND = 15
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def synthesize(self, text, lang):
+        self.calls += 1
+        time.sleep(self.delay)
+        frames = max(1, int(len(text) / self.CHARS_PER_SECOND * 44100 / 1152))
+        return self.FRAME * frames
+
+
+BACKENDS = {"gtts": GTTSBackend, "local": LocalBackend}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = BACKENDS[config.TTS_BACKEND]()
+    return _backend
+
+
+def set_backend(backend):
+    """
+    Replaces the speech backend (any object with synthesize(text, lang) -> MP3 bytes).
+    """
+    global _backend
+    _backend = backend
+
+
+# ---- MP3 pieces ----
+def mp3_frames(data):
+    """
+    The MPEG audio frames of an MP3 file: ID3v2 header and ID3v1 trailer removed, so
+    pieces can be joined end to end without re-encoding.
+    """
+    start = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Syncsafe size: 7 bits per byte, plus the 10-byte header (and footer when flagged)
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        start = 10 + size + (10 if data[5] & 0x10 else 0)
+    end = len(data)
+    if end - start >= 128 and data[end - 128:end - 125] == b"TAG":
+        end -= 128
+    return data[start:end]
+
+
+def split_chunks(text, max_chars=None):
+    """
+    Sentence-aligned pieces of text. The first piece is one sentence so the first audio is ready
+    quickly; later ones collect sentences up to max_chars (a longer sentence stays whole).
+    """
+    max_chars = max_chars or config.TTS_CHUNK_CHARS
+    sentences = [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+    if not sentences:
+        return []
+    chunks = [sentences[0]]
+    current = ""
+    for sentence in sentences[1:]:
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _synthesize_chunk(text, lang):
+    with metrics.timed("fir_backend_seconds", backend="gtts"):
+        return mp3_frames(get_backend().synthesize(text, lang))
+
+
+def _synthesize(text, lang, output_path):
+    with metrics.timed("fir_backend_seconds", backend="gtts"):
+        data = get_backend().synthesize(text, lang)
+    with open(output_path, "wb") as f:
+        f.write(data)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=config.TTS_WORKERS, thread_name_prefix="tts")
+    return _pool
+
+
+def text_to_speech(text, lang='en', filename=None):
+    """
+    Converts text to speech (gTTS, or the backend set with set_backend).
+    By default the audio goes to the content-addressed audio store (static/audio/), so the
+    same text and language are synthesized only once; pass filename to write static/<filename> instead.
+    With TTS_CHUNKED, text of more than one sentence is synthesized in pieces in parallel and this
+    returns once the first piece is written; the rest is appended in order (see audio_store).
+    Returns the saved file path.
     """
     try:
         if not text or text.strip() == "":
             raise ValueError("Empty text provided for TTS")
 
-        # Ensure 'static' directory exists
-        static_dir = os.path.join(os.getcwd(), "static")
-        os.makedirs(static_dir, exist_ok=True)
-
-        # Construct output file path
-        output_path = os.path.join(static_dir, filename)
-
-        # Create TTS object
-        tts = gTTS(text=text, lang=lang, slow=False)
-        tts.save(output_path)
+        if filename is None:
+            chunks = split_chunks(text) if config.TTS_CHUNKED else []
+            if len(chunks) > 1:
+                stored = audio_store.get_or_create_chunked(text, lang, chunks, _synthesize_chunk, _get_pool())
+            else:
+                stored = audio_store.get_or_create(text, lang, _synthesize)
+            output_path = audio_store.audio_path(stored)
+        else:
+            # Ensure 'static' directory exists
+            static_dir = os.path.join(os.getcwd(), "static")
+            os.makedirs(static_dir, exist_ok=True)
+            output_path = os.path.join(static_dir, filename)
+            _synthesize(text, lang, output_path)
 
         print(f"[INFO] Audio saved at: {output_path}")
         return output_path
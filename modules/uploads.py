@@ -0,0 +1,81 @@
+"""
+Uploaded files kept in memory instead of uploads/: small files stay in RAM, larger ones are
+spooled to an anonymous temporary file, and the SHA-256 of the content is computed while
+the request body is parsed, so identical uploads can be recognized without reading them again.
+"""
+import hashlib
+import io
+import tempfile
+
+import config
+
+_CHUNK = 64 * 1024
+
+
+class HashingSpool:
+    """
+    Writable/readable file object (a SpooledTemporaryFile) that hashes everything written to it.
+    """
+    def __init__(self, max_size=None):
+        self._file = tempfile.SpooledTemporaryFile(
+            max_size=config.UPLOAD_SPOOL_BYTES if max_size is None else max_size, mode="w+b")
+        self._hash = hashlib.sha256()
+        self.size = 0
+        self.filename = None
+
+    def write(self, data):
+        self._hash.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # read / seek / tell / close / readline ... go straight to the spooled file
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._file.close()
+
+
+def stream_factory(total_content_length, content_type, filename=None, content_length=None):
+    """
+    Werkzeug file-stream factory (Request._get_file_stream): uploads are hashed as they arrive.
+    """
+    return HashingSpool()
+
+
+def spool(stream):
+    """
+    Copies any readable binary stream into a HashingSpool, rewound for reading.
+    """
+    out = HashingSpool()
+    while True:
+        chunk = stream.read(_CHUNK)
+        if not chunk:
+            break
+        out.write(chunk)
+    out.seek(0)
+    return out
+
+
+def take(file_storage):
+    """
+    The HashingSpool behind a werkzeug FileStorage, detached from the request so it stays open
+    after the response (Flask closes request files on teardown). The caller closes it.
+    """
+    stream = file_storage.stream
+    if not isinstance(stream, HashingSpool):
+        stream = spool(stream)
+    else:
+        stream.seek(0)
+    stream.filename = file_storage.filename
+    file_storage.stream = io.BytesIO()
+    return stream
@@ -1,56 +1,164 @@
+import argparse
 import csv
-from modules.evaluation import evaluate_simplification
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import config
+from modules import fir_simplifier, gemini_client
+from modules.evaluation import evaluate_corpus
 from modules.fir_simplifier import simplify_fir_text
 import pandas as pd
 
 DATASET_FILE = "evaluation_dataset.csv"   # Make sure this file exists
+CHECKPOINT_FILE = "evaluation_checkpoint.jsonl"
+RESULTS_FILE = "full_evaluation_results.csv"
 
-def run_full_evaluation(dataset_path):
-    results = []
-
-    with open(dataset_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-            original = row["original_text"]
-            reference = row["reference_simplified"]
 
-            print("\nEvaluating Case...")
-            print("---------------------------------------------------")
-            print(f"Original Length: {len(original)} characters")
+def row_key(index, original, source):
+    # Row position + text hash + backend: an edited dataset row, or a run with a different
+    # backend configured (e.g. Gemini after truncation-only), is generated again on resume
+    return f"{index}:{hashlib.sha256(original.encode('utf-8')).hexdigest()[:16]}:{source}"
 
-            # STEP 1: Generate output using your system
-            simplified_output = simplify_fir_text(original)
 
-            # STEP 2: Evaluate using the scoring function
-            metrics = evaluate_simplification(original, simplified_output)
+def expected_source():
+    """
+    The backend simplify_fir_text uses when nothing fails: gemini, bart or truncated.
+    """
+    if gemini_client.is_available():
+        return "gemini"
+    if fir_simplifier.HF_AVAILABLE:
+        return "bart"
+    return "truncated"
 
-            # Add useful info for report
-            metrics["reference"] = reference
-            metrics["system_output"] = simplified_output
 
-            print(f"Score for this entry: {metrics['accuracy_score']}%")
-
-            results.append(metrics)
+def load_rows(dataset_path, limit=0):
+    with open(dataset_path, 'r', encoding='utf-8') as f:
+        rows = [(row["original_text"], row["reference_simplified"]) for row in csv.DictReader(f)]
+    return rows[:limit] if limit else rows
+
+
+def load_checkpoint(path):
+    """
+    Generated outputs from earlier runs, by row key. A torn last line (crash mid-write) is ignored.
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            done[record["key"]] = record
+    return done
+
+
+def _simplify(original):
+    report = {}
+    return simplify_fir_text(original, report=report), report.get("source")
+
+
+def _failed(output, source, expected):
+    # A fallback (Gemini deadline -> BART, BART missing -> truncation) is not the configured
+    # system's output, so it is retried rather than scored
+    return output.startswith(("❌", "⚠️")) or source != expected
+
+
+def generate_outputs(rows, checkpoint_path, workers):
+    """
+    Runs simplify_fir_text on every row not yet in the checkpoint, `workers` at a time.
+    Each finished row is appended to the checkpoint immediately; failed rows and rows produced
+    by a fallback backend are not, so they are retried on the next run.
+    """
+    source = expected_source()
+    print(f"🔧 Simplifying with: {source}")
+    done = load_checkpoint(checkpoint_path)
+    pending = [(i, original) for i, (original, _) in enumerate(rows) if row_key(i, original, source) not in done]
+    print(f"🔁 {len(rows) - len(pending)} row(s) already in {checkpoint_path}, {len(pending)} to generate")
+    if not pending:
+        return done
+
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool, open(checkpoint_path, 'a', encoding='utf-8') as out:
+        futures = {pool.submit(_simplify, original): (i, original) for i, original in pending}
+        for n, future in enumerate(as_completed(futures), 1):
+            i, original = futures[future]
+            try:
+                output, produced_by = future.result()
+            except Exception as e:
+                output, produced_by = f"⚠️ Simplification failed: {e}", None
+            if _failed(output, produced_by, source):
+                failures += 1
+                print(f"⚠️ Row {i} failed ({produced_by or 'error'} instead of {source}): {output[:120]}")
+                continue
+            record = {"key": row_key(i, original, source), "index": i, "source": source,
+                      "system_output": output}
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            done[record["key"]] = record
+            if n % 25 == 0 or n == len(futures):
+                rate = n / (time.perf_counter() - start)
+                print(f"   {n}/{len(futures)} generated ({rate:.1f} rows/s)")
+    if failures:
+        print(f"⚠️ {failures} row(s) failed and will be retried on the next run")
+    return done
+
+
+def run_full_evaluation(dataset_path, checkpoint_path=CHECKPOINT_FILE, workers=4, limit=0):
+    # Every row comes from the configured backend, not from results cached by earlier runs
+    config.RESULT_CACHE_ENABLED = False
+    rows = load_rows(dataset_path, limit)
+    done = generate_outputs(rows, checkpoint_path, workers)
+
+    # Metrics over the whole corpus at once, in dataset order
+    source = expected_source()
+    keys = [row_key(i, original, source) for i, (original, _) in enumerate(rows)]
+    evaluated = [(original, reference, done[key]["system_output"])
+                 for key, (original, reference) in zip(keys, rows) if key in done]
+    metrics = evaluate_corpus([o for o, _, _ in evaluated], [s for _, _, s in evaluated])
 
+    results = []
+    for (original, reference, output), m in zip(evaluated, metrics):
+        # Add useful info for report
+        m["reference"] = reference
+        m["system_output"] = output
+        results.append(m)
     return results
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and score simplifications for the evaluation dataset.")
+    parser.add_argument("--dataset", default=DATASET_FILE)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE, help="JSONL of generated outputs (resumed from)")
+    parser.add_argument("--output", default=RESULTS_FILE)
+    parser.add_argument("--workers", type=int, default=4, help="rows simplified concurrently")
+    parser.add_argument("--limit", type=int, default=0, help="only the first N rows (0 = all)")
+    parser.add_argument("--fresh", action="store_true", help="discard the checkpoint and start over")
+    args = parser.parse_args()
+
     print("\n📊 Starting Full System Evaluation...\n")
+    if args.fresh and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
 
-    output = run_full_evaluation(DATASET_FILE)
+    output = run_full_evaluation(args.dataset, args.checkpoint, args.workers, args.limit)
+    if not output:
+        raise SystemExit("❌ No rows were generated successfully.")
 
     # Compute average score
     avg_accuracy = sum(o["accuracy_score"] for o in output) / len(output)
 
     print("\n===================================================")
-    print(f" FINAL PROJECT ACCURACY: {round(avg_accuracy,2)} %")
+    print(f" FINAL PROJECT ACCURACY: {round(avg_accuracy,2)} %  ({len(output)} rows)")
     print("===================================================\n")
 
     # Save results in a CSV for report
     df = pd.DataFrame(output)
-    df.to_csv("full_evaluation_results.csv", index=False)
+    df.to_csv(args.output, index=False)
 
-    print("📁 Results saved as: full_evaluation_results.csv\n")
+    print(f"📁 Results saved as: {args.output}\n")
     print("✅ Evaluation Completed Successfully.\n")
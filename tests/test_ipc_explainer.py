@@ -0,0 +1,51 @@
+"""
+find_section_numbers must pick up every citation form _IPC_PATTERN documents, and nothing else.
+
+    python -m pytest tests/test_ipc_explainer.py
+"""
+import pytest
+
+from modules.ipc_explainer import extract_ipc_sections, find_section_numbers
+
+
+@pytest.mark.parametrize("text, expected", [
+    # Anchor before the sections
+    ("Case registered under IPC 379.", ["379"]),
+    ("Booked under I.P.C. 420", ["420"]),
+    ("punishable under Indian Penal Code 302", ["302"]),
+    ("Section 379 applies", ["379"]),
+    ("Sections 420/406 of IPC", ["420", "406"]),
+    ("Sec. 356, 379", ["356", "379"]),
+    ("u/s 457 & 380", ["457", "380"]),
+    ("u/s 457 and 380", ["457", "380"]),
+    ("Section 302 r/w 34", ["302", "34"]),
+    ("Section 302 read with 34", ["302", "34"]),
+    ("Section 498A or 406", ["498A", "406"]),
+    # Code after the sections
+    ("an offence under 379 IPC", ["379"]),
+    ("420/406 I.P.C.", ["420", "406"]),
+    ("323 and 506 of the Indian Penal Code", ["323", "506"]),
+    ("120B IPC", ["120B"]),
+    # A list running past the code
+    ("u/s 498A IPC and 406", ["498A", "406"]),
+    ("u/s 498A IPC and 406 IPC", ["498A", "406"]),
+    ("Sections 420 of IPC read with 120B IPC", ["420", "120B"]),
+    ("Section 302 IPC r/w 34 IPC", ["302", "34"]),
+])
+def test_citation_forms(text, expected):
+    assert find_section_numbers(text) == expected
+
+
+def test_plain_numbers_ignored():
+    assert find_section_numbers("FIR No. 45 dated 12/03/2023, Rs. 500 stolen from house 12") == []
+    assert find_section_numbers("u/s 379 IPC on 12 March") == ["379"]
+
+
+def test_several_citations_in_order():
+    text = "Registered u/s 457 & 380 IPC. Later 411 IPC was added along with Section 34."
+    assert find_section_numbers(text) == ["457", "380", "411", "34"]
+
+
+def test_extract_skips_unknown_and_repeats():
+    found = extract_ipc_sections("u/s 498A IPC and 406, again 498a IPC, and Section 999Z")
+    assert [d["section"] for d in found] == ["IPC 498A", "IPC 406"]
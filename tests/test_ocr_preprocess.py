@@ -0,0 +1,29 @@
+"""
+Skew estimation in the OCR preprocessing.
+
+    python -m pytest tests/test_ocr_preprocess.py
+"""
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from modules.ocr_extractor import _skew_angle
+
+
+def text_page(angle):
+    page = Image.new("L", (1000, 1000), 255)
+    draw = ImageDraw.Draw(page)
+    font = ImageFont.load_default(size=20)
+    for i in range(25):
+        draw.text((50, 50 + i * 35), "The complainant reported the theft at the station. " * 2, fill=0, font=font)
+    rotated = page.rotate(angle, fillcolor=255)
+    return rotated.point(lambda v: 255 if v > 127 else 0)
+
+
+def test_blank_page_is_not_rotated():
+    # Every angle scores the same; the estimate must not drift to the edge of the range
+    assert _skew_angle(Image.new("L", (600, 800), 255)) == 0.0
+
+
+@pytest.mark.parametrize("angle", [0, 2, -3])
+def test_skewed_text_is_straightened(angle):
+    assert _skew_angle(text_page(angle)) == -angle
@@ -0,0 +1,73 @@
+"""
+predict_outcome must give the same answers as the substring if-chain it replaced.
+
+    python -m pytest tests/test_outcome_predictor.py
+"""
+import csv
+import glob
+import os
+
+import pytest
+
+from modules.outcome_predictor import compile_rules, evaluate_rules, predict_outcome
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def legacy_predict_outcome(fir_text):
+    # The if-chain outcome_predictor.py had before the rule engine
+    text = fir_text.lower()
+    if "murder" in text or "assault" in text:
+        return "High chance of arrest (serious crime)"
+    elif "fraud" in text or "cheating" in text:
+        return "Investigation may take months (financial crime)"
+    elif "theft" in text or "burglary" in text:
+        return "Likely recovery depends on police follow-up"
+    elif "cyber" in text or "atm card" in text:
+        return "Cyber cell involvement needed"
+    return "Outcome unclear – depends on investigation"
+
+
+def fixture_texts():
+    texts = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "uploads", "FIR_*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    with open(os.path.join(ROOT, "crime_dataset.csv"), encoding="utf-8") as f:
+        texts += [row[0] for row in csv.reader(f) if row]
+    with open(os.path.join(ROOT, "evaluation_dataset.csv"), encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            texts += [row["original_text"], row["reference_simplified"]]
+    return texts
+
+
+def test_fixtures_match_legacy():
+    texts = fixture_texts()
+    assert texts
+    mismatches = [(t[:80], legacy_predict_outcome(t), predict_outcome(t))
+                  for t in texts if legacy_predict_outcome(t) != predict_outcome(t)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("text", [
+    "She was defrauded of Rs 15,000 online",
+    "His cyberfraud complaint was registered",
+    "The house was burgled; anti-theft alarm failed",
+    "Attempted murder and assaulted the guard",
+    "Money withdrawn using a stolen ATM card",
+    "Cheating case, then cyber fraud reported",
+    "Lost a wallet near the station",
+])
+def test_substring_forms_match_legacy(text):
+    assert predict_outcome(text) == legacy_predict_outcome(text)
+
+
+def test_overlapping_keywords_all_fire():
+    compiled = compile_rules({"rules": [
+        {"id": "atm", "priority": 2, "keywords": ["atm card"], "outcome": "atm"},
+        {"id": "card-fraud", "priority": 1, "keywords": ["card fraud"], "outcome": "card fraud"},
+        {"id": "fraud", "priority": 0, "keywords": ["*fraud*"], "outcome": "fraud"},
+    ]})
+    fired = evaluate_rules("Complaint of atm card fraud at the branch", compiled=compiled)
+    assert [r["id"] for r in fired] == ["atm", "card-fraud", "fraud"]
+    assert fired[1]["evidence"][0]["text"] == "card fraud"
@@ -0,0 +1,243 @@
+# train.py
+# One entry point for training the crime-type and severity classifiers.
+#
+#   python train.py                          # TF-IDF + logistic regression, both heads in parallel
+#   python train.py --model rf --n-jobs 8    # RandomForest heads (what acc.py trained)
+#   python train.py --search                 # parallel hyperparameter search per head
+#   python train.py --incremental            # hashing features + partial_fit on rows added since last run
+
+import argparse
+import hashlib
+import os
+import time
+
+import joblib
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+
+import config
+from modules import fast_classifier, model_bundle
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import GridSearchCV, train_test_split
+
+# Feature cache and incremental state live next to the bundle
+MODELS_DIR = os.path.dirname(os.path.abspath(config.CLASSIFIER_BUNDLE_PATH))
+CACHE_DIR = os.path.join(MODELS_DIR, "cache")
+INCREMENTAL_STATE = os.path.join(MODELS_DIR, "incremental_state.pkl")
+HEADS = ("Crime_Type", "Severity")
+
+PARAM_GRIDS = {
+    "logreg": {"C": [0.5, 1.0, 2.0, 5.0, 10.0]},
+    "rf": {"n_estimators": [100, 200, 400], "max_depth": [None, 40]},
+}
+
+
+# -----------------------------
+# Data
+# -----------------------------
+def load_dataset(path):
+    """
+    crime_dataset.csv has no header row: FIR text, crime type, severity.
+    A header row is tolerated if one is added later.
+    """
+    df = pd.read_csv(path, header=None, names=["FIR_Text", "Crime_Type", "Severity"], skip_blank_lines=True)
+    if str(df.iloc[0]["FIR_Text"]).strip().lstrip("﻿") == "FIR_Text":
+        df = df.iloc[1:]
+    return df.dropna().reset_index(drop=True)
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_model(kind, n_jobs, **params):
+    if kind == "rf":
+        return RandomForestClassifier(random_state=42, n_jobs=n_jobs, **{"n_estimators": 200, **params})
+    return LogisticRegression(max_iter=1000, **params)
+
+
+# -----------------------------
+# Features (cached by dataset content + vectorizer settings)
+# -----------------------------
+def stop_words():
+    """
+    NLTK's English stopwords, as crime_classifier.py used; scikit-learn's list if the
+    NLTK corpus can't be loaded or downloaded.
+    """
+    try:
+        import nltk
+        from nltk.corpus import stopwords
+        try:
+            return sorted(set(stopwords.words("english")))
+        except LookupError:
+            if nltk.download("stopwords", quiet=True):
+                return sorted(set(stopwords.words("english")))
+    except ImportError:
+        pass
+    print("⚠️ NLTK stopwords unavailable; using scikit-learn's English stop word list.")
+    return sorted(ENGLISH_STOP_WORDS)
+
+
+def _params_key(params):
+    # Functions (the preprocessor) by name: their repr holds a memory address
+    return repr(sorted((k, f"{v.__module__}.{v.__qualname__}" if callable(v) else v) for k, v in params.items()))
+
+
+def vectorize(df, dataset_digest, use_cache=True):
+    # Same features at training and serving time: the cleaning is part of the vectorizer
+    vectorizer = TfidfVectorizer(preprocessor=fast_classifier.letters_only, stop_words=stop_words())
+    key = hashlib.sha256((dataset_digest + _params_key(vectorizer.get_params())).encode()).hexdigest()[:16]
+    cache_path = os.path.join(CACHE_DIR, f"features_{key}.pkl")
+    if use_cache and os.path.exists(cache_path):
+        print(f"♻️ Reusing cached features: {cache_path}")
+        return joblib.load(cache_path)
+
+    X = vectorizer.fit_transform(df["FIR_Text"])
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    joblib.dump((vectorizer, X), cache_path)
+    return vectorizer, X
+
+
+# -----------------------------
+# Full training
+# -----------------------------
+def fit_head(kind, X_train, y_train, search, n_jobs):
+    if search:
+        grid = GridSearchCV(make_model(kind, 1), PARAM_GRIDS[kind], cv=3, n_jobs=n_jobs, scoring="accuracy")
+        grid.fit(X_train, y_train)
+        return grid.best_estimator_, grid.best_params_
+    model = make_model(kind, n_jobs)
+    model.fit(X_train, y_train)
+    return model, {}
+
+
+def train_full(args):
+    df = load_dataset(args.dataset)
+    vectorizer, X = vectorize(df, file_digest(args.dataset), use_cache=not args.no_cache)
+
+    # One split shared by both heads
+    train_idx, test_idx = train_test_split(
+        range(len(df)), test_size=args.test_size, random_state=42, stratify=df["Crime_Type"]
+    )
+    X_train, X_test = X[train_idx], X[test_idx]
+
+    # Both heads train at the same time and split the cores between them
+    # (-1 = all cores, -2 = all but one, as in scikit-learn)
+    n_jobs = effective_n_jobs(args.n_jobs)
+    per_head_jobs = max(1, n_jobs // len(HEADS))
+    fitted = Parallel(n_jobs=min(len(HEADS), n_jobs), prefer="threads")(
+        delayed(fit_head)(args.model, X_train, df[head].iloc[train_idx], args.search, per_head_jobs)
+        for head in HEADS
+    )
+
+    metrics = {}
+    for head, (model, best_params) in zip(HEADS, fitted):
+        y_test = df[head].iloc[test_idx]
+        y_pred = model.predict(X_test)
+        metrics[head] = {"accuracy": round(accuracy_score(y_test, y_pred), 4), "params": best_params}
+        print(f"\n{head} Classification Report:\n", classification_report(y_test, y_pred, zero_division=0))
+    models = {head: model for head, (model, _) in zip(HEADS, fitted)}
+    return vectorizer, models, metrics, len(df)
+
+
+# -----------------------------
+# Incremental training
+# -----------------------------
+def train_incremental(args):
+    """
+    Hashing features need no fitted vocabulary, so rows appended to the dataset since the
+    last run are learned with partial_fit instead of retraining from scratch.
+    """
+    df = load_dataset(args.dataset)
+    state = joblib.load(INCREMENTAL_STATE) if os.path.exists(INCREMENTAL_STATE) else None
+
+    if state is None:
+        vectorizer = HashingVectorizer(n_features=2 ** 18, alternate_sign=False,
+                                       preprocessor=fast_classifier.letters_only, stop_words=stop_words())
+        models = {head: SGDClassifier(loss="log_loss", random_state=42) for head in HEADS}
+        classes = {head: sorted(df[head].unique()) for head in HEADS}
+        state = {"rows": 0, "vectorizer": vectorizer, "models": models, "classes": classes}
+
+    new_rows = df.iloc[state["rows"]:]
+    if new_rows.empty:
+        print("✅ No new rows since the last incremental run.")
+        return None
+
+    for head in HEADS:
+        unknown = set(new_rows[head]) - set(state["classes"][head])
+        if unknown:
+            raise SystemExit(f"❌ New {head} labels {sorted(unknown)} need a full retrain (run without --incremental).")
+
+    X_new = state["vectorizer"].transform(new_rows["FIR_Text"])
+    for _ in range(args.epochs):
+        for head in HEADS:
+            state["models"][head].partial_fit(X_new, new_rows[head], classes=state["classes"][head])
+    state["rows"] = len(df)
+
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    joblib.dump(state, INCREMENTAL_STATE)
+    metrics = {}
+    X_all = state["vectorizer"].transform(df["FIR_Text"])
+    for head in HEADS:
+        # Training-set accuracy: incremental mode keeps no held-out split
+        metrics[head] = {"train_accuracy": round(accuracy_score(df[head], state["models"][head].predict(X_all)), 4)}
+    print(f"➕ Learned {len(new_rows)} new row(s); {state['rows']} rows seen in total.")
+    return state["vectorizer"], state["models"], metrics, state["rows"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the crime-type and severity classifiers.")
+    parser.add_argument("--dataset", default="crime_dataset.csv")
+    parser.add_argument("--model", choices=["logreg", "rf"], default="logreg")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="parallel jobs (-1 = all cores)")
+    parser.add_argument("--search", action="store_true", help="grid-search hyperparameters for each head")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--no-cache", action="store_true", help="re-vectorize even if cached features exist")
+    parser.add_argument("--incremental", action="store_true", help="hashing features + partial_fit on new rows")
+    parser.add_argument("--epochs", type=int, default=5, help="partial_fit passes over new rows (incremental)")
+    parser.add_argument("--bundle", default=config.CLASSIFIER_BUNDLE_PATH, help="where the model bundle is written")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    trained = train_incremental(args) if args.incremental else train_full(args)
+    if trained is None:
+        return
+    vectorizer, models, metrics, rows = trained
+
+    # Running app workers pick the new bundle up on their next request
+    meta = model_bundle.write_bundle(
+        args.bundle, vectorizer, models["Crime_Type"], models["Severity"],
+        metadata={
+            "model": "sgd" if args.incremental else args.model,
+            "dataset_sha256": file_digest(args.dataset),
+            "rows": rows,
+            "metrics": metrics,
+        },
+    )
+
+    fast_path = config.CLASSIFIER_FAST_PATH
+    try:
+        fast_classifier.export(vectorizer, models["Crime_Type"], models["Severity"], fast_path, meta["version"])
+        print(f"⚡ Fast-path arrays written to {fast_path}")
+    except fast_classifier.NotExportable as e:
+        # A stale export would keep serving the previous model
+        if os.path.exists(fast_path):
+            os.remove(fast_path)
+        print(f"[INFO] No fast-path export ({e}); the bundle is served directly.")
+
+    print("\n🎯 Model Training Completed!")
+    print(f"📦 Bundle {meta['version']} written to {args.bundle}")
+    for head, m in metrics.items():
+        print(f"🔍 {head}: {m}")
+    print(f"⏱️ {time.perf_counter() - start:.1f}s\n")
+
+
+if __name__ == "__main__":
+    main()